@@ -1,14 +1,23 @@
-"""bstmap.py: Implements a binary search tree."""
+"""bstmap.py: Implements a self-balancing (AVL) binary search tree."""
 # Standard Library
 from collections.abc import Hashable
 from functools import total_ordering
+import heapq
+from itertools import chain
+import threading
 from typing import (
     Any,
+    Callable,
+    cast,
+    Generic,
     Iterable,
     Iterator,
+    List,
+    Mapping,
     MutableMapping,
     Optional,
     Tuple,
+    Type,
     TypeVar,
 )
 
@@ -18,42 +27,183 @@ from typing import (
 
 
 K = TypeVar("K", bound=Hashable)
+M = TypeVar("M", bound="SortedMapMixin")
+
+
+class SortedMapMixin(MutableMapping[K, Any]):
+    """
+    Bulk loading for sorted maps: from_sorted, update and merge.
+
+    A subclass keeps its keys in the order given by sort_key, iterates over its
+    items in that order, and implements _rebuild to replace its contents with
+    sorted, distinct items in O(n), and _prefers_inserts to say when a few new
+    items are better inserted one at a time.
+    """
+
+    __slots__ = ()
+
+    def __init__(
+        self,
+        iterable: Optional[Iterable[Tuple[K, Any]]] = None,
+        key: Optional[Callable[[K], Any]] = None,
+    ) -> None:
+        """Initialize the items from iterable, ordered by the key function if given."""
+        # Key function, None for natural order
+        self.sort_key: Optional[Callable[[K], Any]] = key
+        if iterable is not None:
+            self.update(iterable)
+
+    @classmethod
+    def from_sorted(
+        cls: Type[M],
+        items: Iterable[Tuple[K, Any]],
+        key: Optional[Callable[[K], Any]] = None,
+    ) -> M:
+        """
+        Build a map in O(n) from (key, value) pairs sorted by key.
+
+        If a key appears more than once the last value wins, and ValueError is
+        raised if the items are out of order.
+        """
+        mapping = cls(key=key)
+        mapping._rebuild(mapping._sorted_items(items, presorted=True))
+        return mapping
+
+    def update(self, other: Any = (), **kwargs: Any) -> None:  # type: ignore
+        """
+        Add the items of a mapping or iterable of pairs, and of kwargs, to self.
+
+        Unless there are only a few of them, the new items are sorted and merged
+        with those of self in one pass, and self is rebuilt from the result.
+        """
+        if (
+            isinstance(other, SortedMapMixin)
+            and other.sort_key is self.sort_key
+            and not kwargs
+        ):
+            new = list(other.items())
+        else:
+            if isinstance(other, Mapping):
+                other = other.items()
+            pairs = chain(other, cast(Iterable[Tuple[K, Any]], kwargs.items()))
+            new = self._sorted_items(pairs, presorted=False)
+        if self._prefers_inserts(len(new)):
+            for k, v in new:
+                self[k] = v
+        else:
+            self._rebuild(self._merged_items(new))
+
+    def merge(self: M, other: Any) -> M:
+        """Return a new map with the items of self and other, preferring other's."""
+        mapping = type(self).from_sorted(self.items(), key=self.sort_key)
+        mapping.update(other)
+        return mapping
+
+    def _order(self, key: K) -> Any:
+        """Return the value that key is sorted by in this map."""
+        return key if self.sort_key is None else self.sort_key(key)
+
+    def _sorted_items(
+        self, items: Iterable[Tuple[K, Any]], presorted: bool
+    ) -> List[Tuple[K, Any]]:
+        """Return items sorted by key, with one item holding the last value per key."""
+        order = self._order
+        if not presorted:
+            items = sorted(items, key=lambda item: order(item[0]))
+        result: List[Tuple[K, Any]] = []
+        prev = None
+        for item in items:
+            k = order(item[0])
+            if result:
+                if k < prev:
+                    raise ValueError("items are not sorted by key")
+                if not prev < k:
+                    # Like a dict, keep the first key but the last value
+                    result[-1] = result[-1][0], item[1]
+                    continue
+            result.append(item)
+            prev = k
+        return result
+
+    def _merged_items(self, items: List[Tuple[K, Any]]) -> List[Tuple[K, Any]]:
+        """Merge the sorted items of self and items, preferring those of items."""
+        order = self._order
+        # heapq.merge is stable, so a key in both comes from items last
+        merged = heapq.merge(self.items(), items, key=lambda item: order(item[0]))
+        return self._sorted_items(merged, presorted=True)
+
+    def _rebuild(self, items: List[Tuple[K, Any]]) -> None:
+        """Replace the contents of self with sorted, distinct items in O(n)."""
+        raise NotImplementedError
+
+    def _prefers_inserts(self, n: int) -> bool:
+        """Is inserting n new items one at a time cheaper than a rebuild?"""
+        raise NotImplementedError
 
 
 @total_ordering
-class BSTMap(MutableMapping[K, Any]):
-    """A Binary search tree."""
+class BSTMap(SortedMapMixin[K]):
+    """
+    A Binary search tree.
+
+    Keys are kept in sorted order, by their natural ordering or by sort_key(key)
+    when a key function is given, as with sorted().
+
+    The tree is kept balanced as an AVL tree, so every operation takes O(log n).
+    Rotations swap the keys and values of nodes rather than the nodes themselves,
+    so the BSTMap object holding the root always stays the root.
+    """
+
+    __slots__ = (
+        "left",
+        "right",
+        "parent",
+        "key",
+        "value",
+        "height",
+        "size",
+        "sort_key",
+    )
 
-    def __init__(self, iterable: Optional[Iterable[Tuple[K, Any]]] = None) -> None:
-        """Initialize a new empty tree."""
+    def __init__(
+        self,
+        iterable: Optional[Iterable[Tuple[K, Any]]] = None,
+        key: Optional[Callable[[K], Any]] = None,
+    ) -> None:
+        """Initialize a new tree, ordered by the key function if one is given."""
         self.left: Optional["BSTMap"] = None
         self.right: Optional["BSTMap"] = None
         self.parent: Optional["BSTMap"] = None
-        self.key: Optional[K] = None
+        # None only at the root of an empty tree
+        self.key: K = None  # type: ignore[assignment]
         self.value: Any = None
-        if iterable is not None:
-            iterator = iter(iterable)
-            init = next(iterator)
-            self.key = init[0]
-            self.value = init[1]
-            for k, v in iterator:
-                self[k] = v
+        # Height of the subtree rooted here, 1 for a leaf
+        self.height: int = 1
+        # Number of keys in the subtree rooted here, 0 for an empty tree
+        self.size: int = 0
+        # The key function is shared by every node of the tree
+        super().__init__(iterable, key)
 
     def __lt__(self, other) -> bool:
-        """Return self < other."""
-        if isinstance(other, BSTMap):
-            return hash(self.key) < hash(other.key)
-        if isinstance(other, Hashable):
-            return hash(self.key) < hash(other)
-        return False
+        """Return self < other, comparing the keys of nodes or a node and a key."""
+        orders = self._compared_orders(other)
+        if orders is None:
+            return NotImplemented
+        try:
+            return orders[0] < orders[1]
+        except TypeError:
+            return NotImplemented
 
     def __eq__(self, other) -> bool:
-        """Return self == other."""
-        if isinstance(other, BSTMap):
-            return hash(self.key) == hash(other.key)
-        if isinstance(other, Hashable):
-            return hash(self.key) == hash(other)
-        return False
+        """Return self == other, comparing the keys of nodes or a node and a key."""
+        orders = self._compared_orders(other)
+        if orders is None:
+            return NotImplemented
+        order, other_order = orders
+        try:
+            return not (order < other_order or other_order < order)
+        except TypeError:
+            return NotImplemented
 
     def __getitem__(self, key: K) -> Any:
         """Return self[key]."""
@@ -61,74 +211,79 @@ class BSTMap(MutableMapping[K, Any]):
 
     def __contains__(self, key) -> bool:
         """Return key in self."""
-        if self == key:
-            return True
-        elif self < key:
-            if self.right is not None:
-                return key in self.right
-            else:
-                return False
-        else:
-            if self.left is not None:
-                return key in self.left
-            else:
-                return False
+        try:
+            self._get_node(key)
+        except KeyError:
+            return False
+        return True
 
     def __delitem__(self, key: K) -> None:
         """del self[key]."""
         node = self._get_node(key)
-        if node.left is None and node.right is None:
-            if node.parent is None:
-                node.key = None
-                node.value = None
-            else:
-                node._delete_from_parent()
-        elif node.left is None and node.right is not None:
-            node._replace_with_right()
-        elif node.right is None and node.left is not None:
-            node._replace_with_left()
-        else:  # node has two children
-            suc = next(node.right._nodes())  # type: ignore
+        if node.left is not None and node.right is not None:
+            # Move the successor's item here, then remove the successor instead
+            suc = node.right
+            while suc.left is not None:
+                suc = suc.left
             node.key = suc.key
             node.value = suc.value
-            if suc.right is not None:
-                suc._replace_with_right()
-            elif suc.parent is not None:
-                suc._delete_from_parent()
+            node = suc
+        parent = node.parent
+        if node.right is not None:
+            node._replace_with_right()
+        elif node.left is not None:
+            node._replace_with_left()
+        elif parent is None:
+            node.key = None
+            node.value = None
+            node.size = 0
+        else:
+            node._delete_from_parent()
+        if parent is not None:
+            parent._retrace()
 
     def __setitem__(self, key: K, value: Any) -> None:
         """Set self[key] = value"""
-        if self == key:
+        if self.key is None:  # empty tree
+            self.key = key
             self.value = value
-        elif self < key:
-            if self.right is not None:
-                self.right[key] = value
-            else:
-                self.right = BSTMap(((key, value),))
-                self.right.parent = self
-        else:
-            if self.left is not None:
-                self.left[key] = value
+            self.size = 1
+            return
+        node = self
+        f = self.sort_key
+        k: Any = key if f is None else f(key)
+        while True:
+            node_k: Any = node.key if f is None else f(node.key)
+            if k < node_k:
+                if node.left is None:
+                    node.left = node._new_child(key, value)
+                    break
+                node = node.left
+            elif node_k < k:
+                if node.right is None:
+                    node.right = node._new_child(key, value)
+                    break
+                node = node.right
             else:
-                self.left = BSTMap(((key, value),))
-                self.left.parent = self
+                node.value = value
+                return
+        node._retrace()
 
     def __iter__(self) -> Iterator[K]:
         """Return iter(self)."""
-        if self.left is not None:
-            yield from self.left
-        if self.key is not None:
-            yield self.key
-        if self.right is not None:
-            yield from self.right
+        return (node.key for node in self._nodes())
+
+    def __reversed__(self) -> Iterator[K]:
+        """Return reversed(self)."""
+        return (node.key for node in self._nodes(reverse=True))
 
     def __len__(self) -> int:
         """Return len(self)."""
-        return len(dict(self))
+        return self.size
 
     def __str__(self) -> str:
         """Return str(self)."""
-        return str(dict(self))
+        return "{" + ", ".join(f"{k!r}: {v!r}" for k, v in self.items()) + "}"
 
     def __repr__(self) -> str:
         """Return repr(self)."""
@@ -140,20 +295,87 @@ class BSTMap(MutableMapping[K, Any]):
 
     def values(self) -> Iterator[Any]:  # type: ignore
         """Return an iterator over the values."""
-        if self.left is not None:
-            yield from self.left.values()
-        yield self.value
-        if self.right is not None:
-            yield from self.right.values()
+        return (node.value for node in self._nodes())
 
     def items(self) -> Iterator[Tuple[K, Any]]:  # type: ignore
         """Return an iterator over key, value tuples."""
-        if self.left is not None:
-            yield from self.left.items()
-        if self.key is not None:
-            yield self.key, self.value
-        if self.right is not None:
-            yield from self.right.items()
+        return ((node.key, node.value) for node in self._nodes())
+
+    def cursor(self) -> "BSTMapCursor":
+        """Return a cursor positioned before the smallest key."""
+        return BSTMapCursor(self)
+
+    def irange(
+        self,
+        minimum: Optional[K] = None,
+        maximum: Optional[K] = None,
+        inclusive: Tuple[bool, bool] = (True, True),
+        reverse: bool = False,
+    ) -> Iterator[K]:
+        """
+        Return an iterator over the keys from minimum to maximum in O(log n + k).
+
+        A bound of None leaves that end of the range open, and inclusive says
+        whether keys equal to minimum and maximum are included.
+        """
+        if self.key is None:
+            return iter(())
+        nodes = _range_nodes(self, self._order, minimum, maximum, inclusive, reverse)
+        return (node.key for node in nodes)
+
+    def floor(self, key: K) -> K:
+        """Return the greatest key <= key, raising KeyError if there is none."""
+        return self._bound(key, below=True).key
+
+    def ceiling(self, key: K) -> K:
+        """Return the least key >= key, raising KeyError if there is none."""
+        return self._bound(key, below=False).key
+
+    def bisect(self, key: K) -> int:
+        """Return the number of keys <= key, the index key would be inserted at."""
+        return self._count_below(key, inclusive=True)
+
+    def rank(self, key: K) -> int:
+        """Return the number of keys < key."""
+        return self._count_below(key, inclusive=False)
+
+    def index(self, key: K) -> int:
+        """Return the position of key in sorted order, raising ValueError if absent."""
+        if key not in self:
+            raise ValueError(f"{key} is not in map")
+        return self.rank(key)
+
+    def select(self, i: int) -> Tuple[K, Any]:
+        """Return the (key, value) pair with the i-th smallest key."""
+        if i < 0:
+            i += self.size
+        if not 0 <= i < self.size:
+            raise IndexError("map index out of range")
+        node = self
+        while True:
+            left = node.left.size if node.left is not None else 0
+            if i < left:
+                node = node.left  # type: ignore
+            elif i > left:
+                i -= left + 1
+                node = node.right  # type: ignore
+            else:
+                return node.key, node.value
+
+    def min(self) -> K:
+        """Return the smallest key, raising KeyError if the map is empty."""
+        return self._end(last=False).key
+
+    def max(self) -> K:
+        """Return the largest key, raising KeyError if the map is empty."""
+        return self._end(last=True).key
+
+    def popitem(self, last: bool = True) -> Tuple[K, Any]:
+        """Remove and return the (key, value) pair with the largest key, or smallest."""
+        node = self._end(last)
+        item = node.key, node.value
+        del self[node.key]
+        return item
 
     def _isBST(self) -> bool:
         """Does self satisfy the tree invariant?"""
@@ -166,28 +388,270 @@ class BSTMap(MutableMapping[K, Any]):
                 return False
         return True
 
-    def _nodes(self) -> Iterator["BSTMap"]:
-        """Return an iterator over the nodes of the tree in-order."""
-        if self.left is not None:
-            yield from self.left._nodes()
-        yield self
-        if self.right is not None:
-            yield from self.right._nodes()
+    def _isBalanced(self) -> bool:
+        """Are the stored heights and sizes right, and is self AVL balanced?"""
+        if self.key is None:
+            return self.size == 0
+        for node in self._nodes():
+            left = node.left.height if node.left is not None else 0
+            right = node.right.height if node.right is not None else 0
+            if node.height != 1 + max(left, right) or abs(left - right) > 1:
+                return False
+            left = node.left.size if node.left is not None else 0
+            right = node.right.size if node.right is not None else 0
+            if node.size != 1 + left + right:
+                return False
+        return True
+
+    def _nodes(self, reverse: bool = False) -> Iterator["BSTMap"]:
+        """
+        Return an iterator over the nodes of the tree in-order.
+
+        The walk follows the parent pointers, so it needs no stack and visits each
+        node in amortized O(1).
+        """
+        if self.key is None:
+            return
+        step = self._predecessor if reverse else self._successor
+        node: Optional["BSTMap"] = self._end(last=reverse)
+        while node is not None:
+            yield node
+            node = step(node)
+
+    def _successor(self, node: "BSTMap") -> Optional["BSTMap"]:
+        """Return the node after node in the subtree at self, or None if last."""
+        if node.right is not None:
+            node = node.right
+            while node.left is not None:
+                node = node.left
+            return node
+        while node is not self and node.parent.right is node:  # type: ignore
+            node = node.parent  # type: ignore
+        return None if node is self else node.parent
+
+    def _predecessor(self, node: "BSTMap") -> Optional["BSTMap"]:
+        """Return the node before node in the subtree at self, or None if first."""
+        if node.left is not None:
+            node = node.left
+            while node.right is not None:
+                node = node.right
+            return node
+        while node is not self and node.parent.left is node:  # type: ignore
+            node = node.parent  # type: ignore
+        return None if node is self else node.parent
 
     def _get_node(self, key: K) -> "BSTMap":
         """Get the node associated with key."""
-        if self == key:
-            return self
-        elif self < key:
-            if self.right is not None:
-                return self.right._get_node(key)
+        node: Optional["BSTMap"] = self
+        if self.key is None:  # empty tree
+            node = None
+        f = self.sort_key
+        k = key if f is None else f(key)
+        while node is not None:
+            node_k = node.key if f is None else f(node.key)
+            if k < node_k:
+                node = node.left
+            elif node_k < k:
+                node = node.right
             else:
-                raise KeyError(f"{key}")
-        else:
-            if self.left is not None:
-                return self.left._get_node(key)
+                return node
+        raise KeyError(f"{key}")
+
+    def _count_below(self, key: K, inclusive: bool) -> int:
+        """Return the number of keys < key, or <= key if inclusive."""
+        node: Optional["BSTMap"] = self
+        if self.key is None:  # empty tree
+            node = None
+        k = self._order(key)
+        count = 0
+        while node is not None:
+            node_k = self._order(node.key)
+            if k < node_k or (not inclusive and not node_k < k):
+                node = node.left
+            else:
+                count += 1 + (node.left.size if node.left is not None else 0)
+                node = node.right
+        return count
+
+    def _rebuild(self, items: List[Tuple[K, Any]]) -> None:
+        """Replace the contents of self with sorted, distinct items in O(n)."""
+        self.left = self.right = None
+        if not items:
+            self.key = None  # type: ignore[assignment]
+            self.value = None
+            self.height = 1
+            self.size = 0
+            return
+        mid = len(items) // 2
+        self.key, self.value = items[mid]
+        self.left = self._build(items, 0, mid)
+        self.right = self._build(items, mid + 1, len(items))
+        if self.left is not None:
+            self.left.parent = self
+        if self.right is not None:
+            self.right.parent = self
+        self._update()
+
+    def _build(
+        self, items: List[Tuple[K, Any]], lo: int, hi: int
+    ) -> Optional["BSTMap"]:
+        """Return a perfectly balanced subtree holding items[lo:hi]."""
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        node = type(self)(key=self.sort_key)
+        node.key, node.value = items[mid]
+        node.left = self._build(items, lo, mid)
+        node.right = self._build(items, mid + 1, hi)
+        if node.left is not None:
+            node.left.parent = node
+        if node.right is not None:
+            node.right.parent = node
+        # Halving the range at each level makes the height that of a complete tree
+        node.size = hi - lo
+        node.height = node.size.bit_length()
+        return node
+
+    def _prefers_inserts(self, n: int) -> bool:
+        """Is inserting n new items one at a time cheaper than a rebuild?"""
+        return n * self.height < self.size
+
+    def _compared_orders(self, other: Any) -> Optional[Tuple[Any, Any]]:
+        """
+        Return the values that self's key and other, a node or a key, sort by.
+
+        Return None if either is an empty tree or other cannot be a key.
+        """
+        if isinstance(other, BSTMap):
+            other = other.key
+        if self.key is None or other is None or not isinstance(other, Hashable):
+            return None
+        try:
+            return self._order(self.key), self._order(cast(K, other))
+        except TypeError:
+            return None
+
+    def _bound(self, key: K, below: bool) -> "BSTMap":
+        """Return the node with the greatest key <= key, or the least >= key."""
+        node: Optional["BSTMap"] = self
+        if self.key is None:  # empty tree
+            node = None
+        k = self._order(key)
+        best = None
+        while node is not None:
+            node_k = self._order(node.key)
+            if node_k < k:
+                if below:
+                    best = node
+                node = node.right
+            elif k < node_k:
+                if not below:
+                    best = node
+                node = node.left
+            else:
+                return node
+        if best is None:
+            raise KeyError(f"{key}")
+        return best
+
+    def _end(self, last: bool) -> "BSTMap":
+        """Return the node with the smallest key, or the largest if last."""
+        if self.key is None:
+            raise KeyError("map is empty")
+        node = self
+        child = node.right if last else node.left
+        while child is not None:
+            node = child
+            child = node.right if last else node.left
+        return node
+
+    def _new_child(self, key: K, value: Any) -> "BSTMap":
+        """Return a new leaf node holding key, value with self as its parent."""
+        child = type(self)(key=self.sort_key)
+        child.key = key
+        child.value = value
+        child.parent = self
+        child.size = 1
+        return child
+
+    def _update(self) -> None:
+        """Recompute self.height and self.size from those of the children."""
+        left = self.left
+        right = self.right
+        if left is None:
+            if right is None:
+                self.height = self.size = 1
             else:
-                raise KeyError(f"{key}")
+                self.height = 1 + right.height
+                self.size = 1 + right.size
+        elif right is None:
+            self.height = 1 + left.height
+            self.size = 1 + left.size
+        else:
+            self.height = 1 + max(left.height, right.height)
+            self.size = 1 + left.size + right.size
+
+    def _balance(self) -> int:
+        """Return the height of the left subtree minus that of the right subtree."""
+        left = self.left.height if self.left is not None else 0
+        right = self.right.height if self.right is not None else 0
+        return left - right
+
+    def _retrace(self) -> None:
+        """Restore the heights, sizes and AVL balance of self and its ancestors."""
+        node: Optional["BSTMap"] = self
+        while node is not None:
+            old_height = node.height
+            node._update()
+            balance = node._balance()
+            if balance > 1:
+                if node.left._balance() < 0:  # type: ignore
+                    node.left._rotate_left()  # type: ignore
+                node._rotate_right()
+            elif balance < -1:
+                if node.right._balance() > 0:  # type: ignore
+                    node.right._rotate_right()  # type: ignore
+                node._rotate_left()
+            elif node.height == old_height:
+                # No heights above here can change, only the subtree sizes
+                node = node.parent
+                while node is not None:
+                    node._update()
+                    node = node.parent
+                return
+            node = node.parent
+
+    def _rotate_right(self) -> None:
+        """Rotate the subtree rooted at self to the right, keeping self at the top."""
+        pivot = self.left
+        self.key, pivot.key = pivot.key, self.key  # type: ignore
+        self.value, pivot.value = pivot.value, self.value  # type: ignore
+        self.left = pivot.left  # type: ignore
+        if self.left is not None:
+            self.left.parent = self
+        pivot.left = pivot.right  # type: ignore
+        pivot.right = self.right  # type: ignore
+        if pivot.right is not None:  # type: ignore
+            pivot.right.parent = pivot  # type: ignore
+        self.right = pivot
+        pivot._update()  # type: ignore
+        self._update()
+
+    def _rotate_left(self) -> None:
+        """Rotate the subtree rooted at self to the left, keeping self at the top."""
+        pivot = self.right
+        self.key, pivot.key = pivot.key, self.key  # type: ignore
+        self.value, pivot.value = pivot.value, self.value  # type: ignore
+        self.right = pivot.right  # type: ignore
+        if self.right is not None:
+            self.right.parent = self
+        pivot.right = pivot.left  # type: ignore
+        pivot.left = self.left  # type: ignore
+        if pivot.left is not None:  # type: ignore
+            pivot.left.parent = pivot  # type: ignore
+        self.left = pivot
+        pivot._update()  # type: ignore
+        self._update()
 
     def _replace_with_right(self):
         """Replace self with its right child."""
@@ -199,6 +663,7 @@ class BSTMap(MutableMapping[K, Any]):
         self.right = self.right.right
         if self.right is not None:
             self.right.parent = self
+        self._update()
 
     def _replace_with_left(self):
         """Replace self with its left child."""
@@ -210,13 +675,597 @@ class BSTMap(MutableMapping[K, Any]):
         self.left = self.left.left
         if self.left is not None:
             self.left.parent = self
+        self._update()
 
     def _delete_from_parent(self):
         """Delete self from its parent node."""
-        if self.parent.left == self:
+        if self.parent.left is self:
             self.parent.left = None
-        if self.parent.right == self:
+        if self.parent.right is self:
             self.parent.right = None
+        self.parent = None
+
+
+class BSTMapCursor:
+    """
+    A bidirectional cursor over the items of a BSTMap, in key order.
+
+    Like a Java ListIterator, the cursor sits in a gap between two items: next()
+    returns the item after the gap and moves past it, and prev() returns the item
+    before the gap and moves back over it, so alternating next() and prev() keep
+    returning the same item.  Either raises StopIteration at the end of the map.
+    Each step follows the parent pointers in amortized O(1).
+
+    As with dict iterators, changing the keys of the map invalidates the cursor.
+    To resume a scan after a change, seek() to the last key seen.
+    """
+
+    __slots__ = ("tree", "_after")
+
+    def __init__(self, tree: BSTMap) -> None:
+        """Initialize a cursor positioned before the smallest key of tree."""
+        self.tree = tree
+        # The node just after the gap, or None at the end of the map
+        self._after: Optional[BSTMap] = None
+        if tree.key is not None:
+            self._after = tree._end(last=False)
+
+    def __iter__(self) -> "BSTMapCursor":
+        """Return iter(self)."""
+        return self
+
+    def __next__(self) -> Tuple[K, Any]:
+        """Return next(self)."""
+        return self.next()
+
+    def seek(self, key: K) -> None:
+        """Move the cursor to just before the first key >= key."""
+        try:
+            self._after = self.tree._bound(key, below=False)
+        except KeyError:
+            self._after = None
+
+    def next(self) -> Tuple[K, Any]:
+        """Return the (key, value) pair after the cursor, and move past it."""
+        node = self._after
+        if node is None:
+            raise StopIteration
+        self._after = self.tree._successor(node)
+        return node.key, node.value
+
+    def prev(self) -> Tuple[K, Any]:
+        """Return the (key, value) pair before the cursor, and move back over it."""
+        if self._after is not None:
+            node = self.tree._predecessor(self._after)
+        elif self.tree.key is not None:
+            node = self.tree._end(last=True)
+        else:
+            node = None
+        if node is None:
+            raise StopIteration
+        self._after = node
+        return node.key, node.value
+
+
+class _PersistentNode(Generic[K]):
+    """An immutable AVL tree node, which may be shared by many PersistentBSTMaps."""
+
+    __slots__ = ("left", "right", "key", "value", "height", "size")
+
+    def __init__(
+        self,
+        key: K,
+        value: Any,
+        left: Optional["_PersistentNode[K]"],
+        right: Optional["_PersistentNode[K]"],
+    ) -> None:
+        """Initialize a node, computing its height and size from its children."""
+        self.left = left
+        self.right = right
+        self.key = key
+        self.value = value
+        if left is None:
+            if right is None:
+                self.height = self.size = 1
+            else:
+                self.height = 1 + right.height
+                self.size = 1 + right.size
+        elif right is None:
+            self.height = 1 + left.height
+            self.size = 1 + left.size
+        else:
+            self.height = 1 + max(left.height, right.height)
+            self.size = 1 + left.size + right.size
+
+
+class PersistentBSTMap(SortedMapMixin[K]):
+    """
+    A self-balancing (AVL) binary search tree with O(1) snapshots.
+
+    The nodes are never modified.  An update copies the nodes on the path from
+    the root to the key it changes, and shares every other subtree with the
+    previous version of the tree, like the Rope does for strings.  snapshot()
+    just shares the current root, so a reader can iterate over a snapshot while
+    writers keep updating the map.
+    """
+
+    __slots__ = ("sort_key", "_root")
+
+    def __init__(
+        self,
+        iterable: Optional[Iterable[Tuple[K, Any]]] = None,
+        key: Optional[Callable[[K], Any]] = None,
+    ) -> None:
+        """Initialize a new tree, ordered by the key function if one is given."""
+        self._root: Optional[_PersistentNode[K]] = None
+        super().__init__(iterable, key)
+
+    def __getitem__(self, key: K) -> Any:
+        """Return self[key]."""
+        f = self.sort_key
+        k: Any = key if f is None else f(key)
+        node = self._root
+        while node is not None:
+            node_k: Any = node.key if f is None else f(node.key)
+            if k < node_k:
+                node = node.left
+            elif node_k < k:
+                node = node.right
+            else:
+                return node.value
+        raise KeyError(f"{key}")
+
+    def __setitem__(self, key: K, value: Any) -> None:
+        """Set self[key] = value, copying only the nodes on the path to key."""
+        self._root = self._insert(self._root, self._order(key), key, value)
+
+    def __delitem__(self, key: K) -> None:
+        """del self[key], copying only the nodes on the path to key."""
+        self._root = self._remove(self._root, self._order(key), key)
+
+    def __iter__(self) -> Iterator[K]:
+        """Return iter(self)."""
+        return self.irange()
+
+    def __len__(self) -> int:
+        """Return len(self)."""
+        return _size(self._root)
+
+    def __str__(self) -> str:
+        """Return str(self)."""
+        return "{" + ", ".join(f"{k!r}: {v!r}" for k, v in self.items()) + "}"
+
+    def __repr__(self) -> str:
+        """Return repr(self)."""
+        return f"{type(self).__name__}({str(self)})"
+
+    def items(self) -> Iterator[Tuple[K, Any]]:  # type: ignore
+        """Return an iterator over key, value tuples."""
+        if self._root is None:
+            return iter(())
+        nodes = _range_nodes(self._root, self._order, None, None, (True, True), False)
+        return ((node.key, node.value) for node in nodes)
+
+    def values(self) -> Iterator[Any]:  # type: ignore
+        """Return an iterator over the values."""
+        return (value for _, value in self.items())
+
+    def clear(self) -> None:
+        """Remove all items from self."""
+        self._root = None
+
+    def cursor(self) -> "PersistentBSTMapCursor":
+        """Return a cursor over a snapshot of self, before the smallest key."""
+        return PersistentBSTMapCursor(self)
+
+    def snapshot(self) -> "PersistentBSTMap":
+        """Return a copy of self in O(1) that later updates to self do not change."""
+        copy = type(self)(key=self.sort_key)
+        copy._root = self._root
+        return copy
+
+    def irange(
+        self,
+        minimum: Optional[K] = None,
+        maximum: Optional[K] = None,
+        inclusive: Tuple[bool, bool] = (True, True),
+        reverse: bool = False,
+    ) -> Iterator[K]:
+        """
+        Return an iterator over the keys from minimum to maximum in O(log n + k).
+
+        The iterator walks the tree as it was when irange was called, whatever
+        updates are made to self in the meantime.
+        """
+        if self._root is None:
+            return iter(())
+        nodes = _range_nodes(
+            self._root, self._order, minimum, maximum, inclusive, reverse
+        )
+        return (node.key for node in nodes)
+
+    def min(self) -> K:
+        """Return the smallest key, raising KeyError if the map is empty."""
+        if self._root is None:
+            raise KeyError("map is empty")
+        return next(self.irange())
+
+    def max(self) -> K:
+        """Return the largest key, raising KeyError if the map is empty."""
+        if self._root is None:
+            raise KeyError("map is empty")
+        return next(self.irange(reverse=True))
+
+    def floor(self, key: K) -> K:
+        """Return the greatest key <= key, raising KeyError if there is none."""
+        return self._bound(key, below=True).key
+
+    def ceiling(self, key: K) -> K:
+        """Return the least key >= key, raising KeyError if there is none."""
+        return self._bound(key, below=False).key
+
+    def bisect(self, key: K) -> int:
+        """Return the number of keys <= key, the index key would be inserted at."""
+        return self._count_below(key, inclusive=True)
+
+    def rank(self, key: K) -> int:
+        """Return the number of keys < key."""
+        return self._count_below(key, inclusive=False)
+
+    def index(self, key: K) -> int:
+        """Return the position of key in sorted order, raising ValueError if absent."""
+        if key not in self:
+            raise ValueError(f"{key} is not in map")
+        return self.rank(key)
+
+    def select(self, i: int) -> Tuple[K, Any]:
+        """Return the (key, value) pair with the i-th smallest key."""
+        node = self._root
+        if i < 0:
+            i += _size(node)
+        while node is not None and i >= 0:
+            left = _size(node.left)
+            if i < left:
+                node = node.left
+            elif i > left:
+                i -= left + 1
+                node = node.right
+            else:
+                return node.key, node.value
+        raise IndexError("map index out of range")
+
+    def popitem(self, last: bool = True) -> Tuple[K, Any]:
+        """Remove and return the (key, value) pair with the largest key, or smallest."""
+        root = self._root
+        if root is None:
+            raise KeyError("map is empty")
+        node = root
+        child = node.right if last else node.left
+        while child is not None:
+            node = child
+            child = node.right if last else node.left
+        self._root = self._remove(root, self._order(node.key), node.key)
+        return node.key, node.value
+
+    def _isBalanced(self) -> bool:
+        """Are the keys in order, the heights and sizes right, and self AVL balanced?"""
+        keys = [self._order(k) for k in self]
+        if any(not a < b for a, b in zip(keys, keys[1:])):
+            return False
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            left, right = _height(node.left), _height(node.right)
+            if node.height != 1 + max(left, right) or abs(left - right) > 1:
+                return False
+            if node.size != 1 + _size(node.left) + _size(node.right):
+                return False
+            stack.extend((node.left, node.right))
+        return True
+
+    def _bound(self, key: K, below: bool) -> _PersistentNode[K]:
+        """Return the node with the greatest key <= key, or the least >= key."""
+        node = self._root
+        k = self._order(key)
+        best = None
+        while node is not None:
+            node_k = self._order(node.key)
+            if node_k < k:
+                if below:
+                    best = node
+                node = node.right
+            elif k < node_k:
+                if not below:
+                    best = node
+                node = node.left
+            else:
+                return node
+        if best is None:
+            raise KeyError(f"{key}")
+        return best
+
+    def _count_below(self, key: K, inclusive: bool) -> int:
+        """Return the number of keys < key, or <= key if inclusive."""
+        node = self._root
+        k = self._order(key)
+        count = 0
+        while node is not None:
+            node_k = self._order(node.key)
+            if k < node_k or (not inclusive and not node_k < k):
+                node = node.left
+            else:
+                count += 1 + _size(node.left)
+                node = node.right
+        return count
+
+    def _rebuild(self, items: List[Tuple[K, Any]]) -> None:
+        """Replace the contents of self with sorted, distinct items in O(n)."""
+        self._root = _built(items, 0, len(items))
+
+    def _prefers_inserts(self, n: int) -> bool:
+        """Is inserting n new items one at a time cheaper than a rebuild?"""
+        root = self._root
+        return root is not None and n * root.height < root.size
+
+    def _insert(
+        self, node: Optional[_PersistentNode[K]], k: Any, key: K, value: Any
+    ) -> _PersistentNode[K]:
+        """Return a copy of the subtree at node with key set to value."""
+        if node is None:
+            return _PersistentNode(key, value, None, None)
+        node_k = node.key if self.sort_key is None else self.sort_key(node.key)
+        if k < node_k:
+            left = self._insert(node.left, k, key, value)
+            return _balanced(node.key, node.value, left, node.right)
+        if node_k < k:
+            right = self._insert(node.right, k, key, value)
+            return _balanced(node.key, node.value, node.left, right)
+        return _PersistentNode(node.key, value, node.left, node.right)
+
+    def _remove(
+        self, node: Optional[_PersistentNode[K]], k: Any, key: K
+    ) -> Optional[_PersistentNode[K]]:
+        """Return a copy of the subtree at node without key."""
+        if node is None:
+            raise KeyError(f"{key}")
+        node_k = self._order(node.key)
+        if k < node_k:
+            left = self._remove(node.left, k, key)
+            return _balanced(node.key, node.value, left, node.right)
+        if node_k < k:
+            right = self._remove(node.right, k, key)
+            return _balanced(node.key, node.value, node.left, right)
+        if node.left is None:
+            return node.right
+        if node.right is None:
+            return node.left
+        # Move the successor's item up here
+        right, successor = _remove_min(node.right)
+        return _balanced(successor.key, successor.value, node.left, right)
+
+
+class ConcurrentBSTMap(PersistentBSTMap[K]):
+    """
+    A PersistentBSTMap that many threads can read and update at once.
+
+    Readers never lock: an update builds its new nodes off to the side and then
+    replaces the root in one assignment, so a lookup or iteration always sees
+    one complete version of the tree.  Writers take a lock, so that concurrent
+    updates, and read-modify-write methods like pop() and setdefault(), are not
+    lost.
+    """
+
+    __slots__ = ("_lock",)
+
+    def __init__(
+        self,
+        iterable: Optional[Iterable[Tuple[K, Any]]] = None,
+        key: Optional[Callable[[K], Any]] = None,
+    ) -> None:
+        """Initialize a new tree, ordered by the key function if one is given."""
+        # Reentrant, because the MutableMapping mixins call __setitem__ and co.
+        self._lock = threading.RLock()
+        super().__init__(iterable, key)
+
+    def __setitem__(self, key: K, value: Any) -> None:
+        """Set self[key] = value"""
+        with self._lock:
+            super().__setitem__(key, value)
+
+    def __delitem__(self, key: K) -> None:
+        """del self[key]."""
+        with self._lock:
+            super().__delitem__(key)
+
+    def clear(self) -> None:
+        """Remove all items from self."""
+        with self._lock:
+            super().clear()
+
+    def pop(self, key: K, *default: Any) -> Any:
+        """Remove key and return its value, or default if it is not in self."""
+        with self._lock:
+            return super().pop(key, *default)
+
+    def popitem(self, last: bool = True) -> Tuple[K, Any]:
+        """Remove and return the (key, value) pair with the largest key, or smallest."""
+        with self._lock:
+            return super().popitem(last)
+
+    def setdefault(self, key: K, default: Any = None) -> Any:
+        """Return self[key], first setting it to default if key is not in self."""
+        with self._lock:
+            return super().setdefault(key, default)
+
+    def update(self, other: Any = (), **kwargs: Any) -> None:  # type: ignore
+        """Add the items of a mapping or iterable of pairs, and of kwargs, to self."""
+        with self._lock:
+            super().update(other, **kwargs)
+
+
+class PersistentBSTMapCursor:
+    """
+    A bidirectional cursor over the items of a PersistentBSTMap, in key order.
+
+    The cursor moves like a BSTMapCursor, but over a snapshot taken when it was
+    made, so updates to the map, from this thread or others, never invalidate
+    it.  It keeps the number of items before its gap, and each step selects the
+    item next to the gap by rank in O(log n).
+    """
+
+    __slots__ = ("tree", "_index")
+
+    def __init__(self, tree: PersistentBSTMap) -> None:
+        """Initialize a cursor positioned before the smallest key of tree."""
+        self.tree = tree.snapshot()
+        # The number of items before the gap
+        self._index = 0
+
+    def __iter__(self) -> "PersistentBSTMapCursor":
+        """Return iter(self)."""
+        return self
+
+    def __next__(self) -> Tuple[K, Any]:
+        """Return next(self)."""
+        return self.next()
+
+    def seek(self, key: K) -> None:
+        """Move the cursor to just before the first key >= key."""
+        self._index = self.tree.rank(key)
+
+    def next(self) -> Tuple[K, Any]:
+        """Return the (key, value) pair after the cursor, and move past it."""
+        if self._index >= len(self.tree):
+            raise StopIteration
+        item = self.tree.select(self._index)
+        self._index += 1
+        return item
+
+    def prev(self) -> Tuple[K, Any]:
+        """Return the (key, value) pair before the cursor, and move back over it."""
+        if self._index == 0:
+            raise StopIteration
+        self._index -= 1
+        return self.tree.select(self._index)
+
+
+def _height(node: Optional[_PersistentNode[Any]]) -> int:
+    """Return the height of the subtree at node, 0 if it is empty."""
+    return 0 if node is None else node.height
+
+
+def _size(node: Optional[_PersistentNode[Any]]) -> int:
+    """Return the number of keys in the subtree at node."""
+    return 0 if node is None else node.size
+
+
+def _balanced(
+    key: K,
+    value: Any,
+    left: Optional[_PersistentNode[K]],
+    right: Optional[_PersistentNode[K]],
+) -> _PersistentNode[K]:
+    """
+    Return a new node with key, value and the given subtrees, rotated if needed.
+
+    The heights of left and right may differ by at most 2, as they do after one
+    insert or delete.  A rotation makes new nodes rather than relinking old ones,
+    which other trees may still be using.
+    """
+    node = _PersistentNode
+    left_height, right_height = _height(left), _height(right)
+    if left is not None and left_height > right_height + 1:
+        mid = left.right
+        if mid is not None and _height(left.left) < mid.height:
+            return node(
+                mid.key,
+                mid.value,
+                node(left.key, left.value, left.left, mid.left),
+                node(key, value, mid.right, right),
+            )
+        return node(
+            left.key, left.value, left.left, node(key, value, left.right, right)
+        )
+    if right is not None and right_height > left_height + 1:
+        mid = right.left
+        if mid is not None and _height(right.right) < mid.height:
+            return node(
+                mid.key,
+                mid.value,
+                node(key, value, left, mid.left),
+                node(right.key, right.value, mid.right, right.right),
+            )
+        return node(
+            right.key, right.value, node(key, value, left, right.left), right.right
+        )
+    return node(key, value, left, right)
+
+
+def _built(
+    items: List[Tuple[K, Any]], lo: int, hi: int
+) -> Optional[_PersistentNode[K]]:
+    """Return a perfectly balanced subtree holding items[lo:hi]."""
+    if lo >= hi:
+        return None
+    mid = (lo + hi) // 2
+    key, value = items[mid]
+    return _PersistentNode(
+        key, value, _built(items, lo, mid), _built(items, mid + 1, hi)
+    )
+
+
+def _remove_min(
+    node: _PersistentNode[K],
+) -> Tuple[Optional[_PersistentNode[K]], _PersistentNode[K]]:
+    """Return a copy of the subtree at node without its smallest key, and that node."""
+    if node.left is None:
+        return node.right, node
+    left, smallest = _remove_min(node.left)
+    return _balanced(node.key, node.value, left, node.right), smallest
+
+
+def _range_nodes(
+    root: Any,
+    order: Callable[[Any], Any],
+    minimum: Any,
+    maximum: Any,
+    inclusive: Tuple[bool, bool],
+    reverse: bool,
+) -> Iterator[Any]:
+    """
+    Yield the nodes of the tree at root with keys from minimum to maximum in order.
+
+    The walk skips every subtree lying before the start of the range and stops at
+    its end, so it takes O(log n + k).  A bound of None leaves that end open.
+    """
+    lo = None if minimum is None else order(minimum)
+    hi = None if maximum is None else order(maximum)
+
+    def above_lo(node_k) -> bool:
+        return lo is None or lo < node_k or (inclusive[0] and not node_k < lo)
+
+    def below_hi(node_k) -> bool:
+        return hi is None or node_k < hi or (inclusive[1] and not hi < node_k)
+
+    first, second = ("right", "left") if reverse else ("left", "right")
+    in_start, in_end = (below_hi, above_lo) if reverse else (above_lo, below_hi)
+    stack: List[Any] = []
+    node = root
+    while stack or node is not None:
+        if node is not None:
+            if in_start(order(node.key)):
+                stack.append(node)
+                node = getattr(node, first)
+            else:
+                node = getattr(node, second)
+        else:
+            node = stack.pop()
+            if not in_end(order(node.key)):
+                return
+            yield node
+            node = getattr(node, second)
 
 
 if __name__ == "__main__":
@@ -225,4 +1274,84 @@ if __name__ == "__main__":
     tree = BSTMap(lst)
     print(tree._get_node(2) == tree[2])
     print(tree)
-    # pass
+
+    # Compare memory per key with and without __slots__.
+    import random
+    from pyutils import allocated_bytes, without_slots  # type: ignore
+
+    N = 10 ** 5
+    keys = random.sample(range(10 * N), N)
+    for label, cls in [("without", without_slots(BSTMap)), ("with", BSTMap)]:
+        size = allocated_bytes(lambda: cls(zip(keys, keys)))
+        print(f"BSTMap {label} __slots__: {size / N:.1f} bytes per key")
+
+    # Compare loading sorted records one at a time with bulk loading and merging.
+    from timer import Timer  # type: ignore
+
+    N = 10 ** 6
+    records = [(k, k) for k in range(N)]
+    with Timer(name=f"{N} single inserts of sorted keys"):
+        tree = BSTMap()
+        for k, v in records:
+            tree[k] = v
+    with Timer(name=f"BSTMap.from_sorted of {N} keys"):
+        tree = BSTMap.from_sorted(records)
+    with Timer(name=f"BSTMap() of {N} shuffled keys"):
+        tree = BSTMap(random.sample(records, N))
+    evens = BSTMap.from_sorted(records[::2])
+    odds = BSTMap.from_sorted(records[1::2])
+    with Timer(name=f"Merge two maps of {N // 2} keys"):
+        tree = evens.merge(odds)
+
+    # Compare taking a snapshot with copying the map, then updating the original.
+    N = 10 ** 5
+    tree = BSTMap(zip(keys[:N], keys[:N]))
+    ptree = PersistentBSTMap(zip(keys[:N], keys[:N]))
+    with Timer(name=f"dict() copy of a BSTMap of {N} keys"):
+        copy = dict(tree.items())
+    with Timer(name=f"snapshot() of a PersistentBSTMap of {N} keys"):
+        snap = ptree.snapshot()
+    with Timer(name=f"{N} updates to a PersistentBSTMap with a live snapshot"):
+        for k in keys[:N]:
+            ptree[k] = -k
+    print(all(snap[k] == k for k in keys[:N]))
+
+    # Throughput of threads doing 90% lookups and 10% updates, against a BSTMap
+    # that takes one lock around every operation.
+    class LockedBSTMap:
+        def __init__(self, items: Iterable[Tuple[Any, Any]]) -> None:
+            self.tree = BSTMap(items)
+            self.lock = threading.Lock()
+
+        def __getitem__(self, key: Any) -> Any:
+            with self.lock:
+                return self.tree[key]
+
+        def __setitem__(self, key: Any, value: Any) -> None:
+            with self.lock:
+                self.tree[key] = value
+
+    N = 10 ** 5
+    ops = 20000
+    for threads in (1, 4, 16):
+        maps = [("BSTMap + lock", LockedBSTMap), ("Concurrent", ConcurrentBSTMap)]
+        for label, make in maps:
+            shared = make(zip(keys[:N], keys[:N]))
+
+            def work() -> None:
+                for i, k in enumerate(random.choices(keys[:N], k=ops)):
+                    if i % 10:
+                        shared[k]
+                    else:
+                        shared[k] = i
+
+            pool = [threading.Thread(target=work) for _ in range(threads)]
+            timer = Timer(logger=None)
+            timer.start()
+            for thread in pool:
+                thread.start()
+            for thread in pool:
+                thread.join()
+            elapsed = timer.stop()
+            rate = threads * ops / elapsed
+            print(f"{label:>14}, {threads:>2} threads: {rate:,.0f} ops/s")
@@ -1,7 +1,7 @@
 """btree.py: binary tree representation."""
 # Standard library
 from collections import deque
-from typing import Generic, Iterator, Optional, TypeVar
+from typing import Generic, Iterable, Iterator, List, Optional, TypeVar
 
 # Third party libraries
 
@@ -11,7 +11,15 @@ T = TypeVar("T")
 
 
 class BTree(Generic[T]):
-    """Binary tree node."""
+    """
+    Binary tree node.
+
+    Each node caches the size of its subtree.  Setting left or right makes the
+    new child point back to its parent, and clears the cached sizes on the path
+    to the root, so a node should be the child of only one parent at a time.
+    """
+
+    __slots__ = ("_left", "_right", "parent", "data", "_size")
 
     def __init__(
         self,
@@ -21,9 +29,13 @@ class BTree(Generic[T]):
         right_child: Optional["BTree"] = None
     ) -> None:
         """Initialize new Binary tree."""
+        self._left: Optional[BTree] = None
+        self._right: Optional[BTree] = None
+        self.parent: Optional[BTree] = None
+        self.data = data
+        self._size: Optional[int] = 1
         self.left = left_child
         self.right = right_child
-        self.data = data
 
     def __repr__(self) -> str:
         """Return repr(self)."""
@@ -43,31 +55,61 @@ class BTree(Generic[T]):
 
     def __len__(self) -> int:
         """Return len(self)."""
-        return len(list(iter(self)))
+        if self._size is None:
+            self._count()
+        return self._size  # type: ignore
+
+    @property
+    def left(self) -> Optional["BTree"]:
+        """The left child, or None."""
+        return self._left
+
+    @left.setter
+    def left(self, child: Optional["BTree"]) -> None:
+        self._left = self._adopt(self._left, child)
+
+    @property
+    def right(self) -> Optional["BTree"]:
+        """The right child, or None."""
+        return self._right
+
+    @right.setter
+    def right(self, child: Optional["BTree"]) -> None:
+        self._right = self._adopt(self._right, child)
 
     def inorder(self) -> Iterator[T]:
         """Perform inorder tree traversal."""
-        if self.left is not None:
-            yield from self.left.inorder()
-        yield self.data
-        if self.right is not None:
-            yield from self.right.inorder()
+        stack: List["BTree"] = []
+        node: Optional[BTree] = self
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node._left
+            node = stack.pop()
+            yield node.data
+            node = node._right
 
     def preorder(self) -> Iterator[T]:
         """Perform preorder tree traversal."""
-        yield self.data
-        if self.left is not None:
-            yield from self.left.preorder()
-        if self.right is not None:
-            yield from self.right.preorder()
+        for node in self._preorder_nodes():
+            yield node.data
 
     def postorder(self) -> Iterator[T]:
         """Perform postorder tree traversal."""
-        if self.left is not None:
-            yield from self.left.postorder()
-        if self.right is not None:
-            yield from self.right.postorder()
-        yield self.data
+        stack: List["BTree"] = []
+        node: Optional[BTree] = self
+        last = None
+        while stack or node is not None:
+            if node is not None:
+                stack.append(node)
+                node = node._left
+                continue
+            top = stack[-1]
+            if top._right is not None and top._right is not last:
+                node = top._right
+            else:
+                yield top.data
+                last = stack.pop()
 
     def levelorder(self) -> Iterator[T]:
         """Perform level order tree traversal."""
@@ -83,12 +125,181 @@ class BTree(Generic[T]):
 
     def leaves(self) -> Iterator[T]:
         """Iterate over the leaf nodes in order."""
-        if self.left is not None:
-            yield from self.left.leaves()
-        if self.right is not None:
-            yield from self.right.leaves()
-        if self.right is None and self.left is None:
-            yield self.data
+        for node in self._preorder_nodes():
+            if node._left is None and node._right is None:
+                yield node.data
+
+    def _preorder_nodes(self) -> Iterator["BTree"]:
+        """Iterate over the nodes of the tree in preorder."""
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            yield node
+            if node._right is not None:
+                stack.append(node._right)
+            if node._left is not None:
+                stack.append(node._left)
+
+    def _adopt(
+        self, old: Optional["BTree"], child: Optional["BTree"]
+    ) -> Optional["BTree"]:
+        """Make child replace old as a child of self, and return child."""
+        if old is not None and old.parent is self:
+            old.parent = None
+        if child is not None:
+            child.parent = self
+        if child is old:
+            return child
+        # A node's size is only cached if its descendants' sizes are, so stop at
+        # the first ancestor that has already been cleared.
+        node: Optional[BTree] = self
+        while node is not None and node._size is not None:
+            node._size = None
+            node = node.parent
+        return child
+
+    def _count(self) -> None:
+        """Cache the sizes of self and of every node below it lacking one."""
+        stale = []
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            stale.append(node)
+            if node._left is not None and node._left._size is None:
+                stack.append(node._left)
+            if node._right is not None and node._right._size is None:
+                stack.append(node._right)
+        # Children come after their parents in stale, so count from the end
+        for node in reversed(stale):
+            size = 1
+            if node._left is not None:
+                size += node._left._size  # type: ignore
+            if node._right is not None:
+                size += node._right._size  # type: ignore
+            node._size = size
+
+
+class ArrayBTree(Generic[T]):
+    """
+    Complete binary tree stored in a list in level order.
+
+    The children of the node at index i are at 2i + 1 and 2i + 2, and its parent
+    at (i - 1) // 2, so the traversals step between nodes with index arithmetic
+    instead of following pointers, and need no stack.  Only complete trees, with
+    every level full except the last, which is filled from the left, can be
+    stored this way.
+    """
+
+    __slots__ = ("_data",)
+
+    def __init__(self, iterable: Optional[Iterable[T]] = None) -> None:
+        """Initialize the complete tree holding the items of iterable in level order."""
+        self._data: List[T] = [] if iterable is None else list(iterable)
+
+    @classmethod
+    def from_tree(cls, tree: BTree[T]) -> "ArrayBTree[T]":
+        """Return an ArrayBTree holding tree, or raise ValueError if not complete."""
+        result = cls(tree.levelorder())
+        # In level order, a complete tree has no gaps before its last node
+        level = deque([(tree, 0)])
+        while level:
+            node, i = level.popleft()
+            if i >= len(result):
+                raise ValueError("tree is not complete")
+            if node.left is not None:
+                level.append((node.left, 2 * i + 1))
+            if node.right is not None:
+                level.append((node.right, 2 * i + 2))
+        return result
+
+    def __repr__(self) -> str:
+        """Return repr(self)."""
+        return f"ArrayBTree({self._data})"
+
+    def __iter__(self) -> Iterator[T]:
+        """Return iter(self)."""
+        return self.inorder()
+
+    def __len__(self) -> int:
+        """Return len(self)."""
+        return len(self._data)
+
+    def to_tree(self) -> Optional[BTree[T]]:
+        """Return the tree as linked BTree nodes, or None if it is empty."""
+        nodes = [BTree(item) for item in self._data]
+        for i in range(len(nodes) - 1, 0, -1):
+            if i % 2:
+                nodes[(i - 1) // 2].left = nodes[i]
+            else:
+                nodes[(i - 1) // 2].right = nodes[i]
+        return nodes[0] if nodes else None
+
+    def inorder(self) -> Iterator[T]:
+        """Perform inorder tree traversal."""
+        data, n = self._data, len(self._data)
+        i = self._leftmost(0)
+        while i < n:
+            yield data[i]
+            if 2 * i + 2 < n:
+                i = 2 * i + 2
+                while 2 * i + 1 < n:
+                    i = 2 * i + 1
+                continue
+            # Climb while i is a right child; then its parent comes next
+            while i > 0 and i % 2 == 0:
+                i = (i - 1) // 2
+            i = (i - 1) // 2 if i > 0 else n
+
+    def preorder(self) -> Iterator[T]:
+        """Perform preorder tree traversal."""
+        data, n = self._data, len(self._data)
+        i = 0
+        while i < n:
+            yield data[i]
+            if 2 * i + 1 < n:
+                i = 2 * i + 1
+                continue
+            # Climb to the nearest left child with a right sibling; visit that
+            while i > 0 and (i % 2 == 0 or i + 1 >= n):
+                i = (i - 1) // 2
+            i = i + 1 if i > 0 else n
+
+    def postorder(self) -> Iterator[T]:
+        """Perform postorder tree traversal."""
+        data, n = self._data, len(self._data)
+        if not n:
+            return
+        i = self._leftmost(0)
+        while True:
+            yield data[i]
+            if i == 0:
+                return
+            if i % 2 and i + 1 < n:
+                i = self._leftmost(i + 1)
+            else:
+                i = (i - 1) // 2
+
+    def levelorder(self) -> Iterator[T]:
+        """Perform level order tree traversal."""
+        return iter(self._data)
+
+    def leaves(self) -> Iterator[T]:
+        """Iterate over the leaf nodes in order."""
+        # The leaves are the nodes from n // 2 on; the ones on the last level
+        # are leftmost, and the rest of the level above follow them.
+        data, n = self._data, len(self._data)
+        if not n:
+            return
+        last_level = (1 << n.bit_length() - 1) - 1
+        yield from data[last_level:]
+        yield from data[n // 2 : last_level]
+
+    def _leftmost(self, i: int) -> int:
+        """Return the index of the leftmost node in the subtree at i."""
+        n = len(self._data)
+        while 2 * i + 1 < n:
+            i = 2 * i + 1
+        return i
 
 
 if __name__ == "__main__":
@@ -100,3 +311,36 @@ if __name__ == "__main__":
     tree.right.left = BTree(6)
     tree.right.right = BTree(7)
 
+    # Compare memory per node with and without __slots__.
+    from pyutils import allocated_bytes, without_slots  # type: ignore
+
+    def complete_tree(cls, n: int, i: int = 0) -> Optional[BTree]:
+        """Build a complete tree with nodes labelled 0 to n - 1 in level order."""
+        if i >= n:
+            return None
+        return cls(
+            i,
+            left_child=complete_tree(cls, n, 2 * i + 1),
+            right_child=complete_tree(cls, n, 2 * i + 2),
+        )
+
+    N = 10 ** 5
+    for label, cls in [("without", without_slots(BTree)), ("with", BTree)]:
+        size = allocated_bytes(lambda: complete_tree(cls, N))
+        print(f"BTree {label} __slots__: {size / N:.1f} bytes per node")
+
+    # Compare traversal times of linked nodes and the array layout, and the cost
+    # of len() before and after the subtree sizes are cached.
+    from timer import Timer  # type: ignore
+
+    tree = complete_tree(BTree, N)  # type: ignore
+    array = ArrayBTree.from_tree(tree)
+    for order in ("inorder", "preorder", "postorder", "leaves"):
+        for name, t in (("BTree", tree), ("ArrayBTree", array)):
+            with Timer(name=f"{name}: {order} of {N} nodes"):
+                for _ in getattr(t, order)():
+                    pass
+    with Timer(name=f"BTree: first len() of {N} nodes"):
+        len(tree)
+    with Timer(name=f"BTree: second len() of {N} nodes"):
+        len(tree)
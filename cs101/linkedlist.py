@@ -1,42 +1,102 @@
 """linkedlist.py:  circular doubly linked list."""
 # standard library
-from collections.abc import MutableSequence
-from typing import Generic, Iterable, Iterator, Optional, TypeVar, Union
+from array import array
+from collections.abc import MutableSequence, Sized
+from typing import (
+    Any,
+    Generic,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+    overload,
+)
 
 # third party libraries
 
 # local libraries
 
 T = TypeVar("T")
+# The handle to a node: a LinkedNode, or the slot of a node in an ArrayLinkedList
+H = TypeVar("H")
+L = TypeVar("L", bound="BaseLinkedList")
 
 
-class LinkedList(Generic[T], MutableSequence):
-    """A circular doubly linked list."""
+class _Owner(object):
+    """
+    Records which list a node belongs to, through a chain of forwarding owners.
 
-    class Node(object):
-        """A node in the list."""
-
-        def __init__(
-            self,
-            data: T,
-            prev_node: Optional["Node"] = None,
-            next_node: Optional["Node"] = None,
-        ) -> None:
-            """Initialize a node."""
-            self.prev: Optional["Node"] = prev_node
-            self.next: Optional["Node"] = next_node
-            self.data: T = data
-
-    def __init__(self, iterable: Optional[Iterable] = None) -> None:
-        """Initialize linked list object."""
-        self.head = None
+    Nodes point at an owner rather than at their list, so that splice can hand
+    every node of one list to another in O(1) by forwarding the one owner.
+    """
+
+    __slots__ = ("list", "forward")
+
+    def __init__(self, owner_list: Optional["LinkedList[Any]"]) -> None:
+        """Initialize an owner for owner_list."""
+        self.list = owner_list
+        self.forward: Optional["_Owner"] = None
+
+
+class LinkedNode(Generic[T]):
+    """
+    A node in a LinkedList.
+
+    A node that is not given its neighbours links to itself, a list of one.
+    """
+
+    __slots__ = ("prev", "next", "data", "owner")
+
+    def __init__(
+        self,
+        data: T,
+        prev_node: Optional["LinkedNode[T]"] = None,
+        next_node: Optional["LinkedNode[T]"] = None,
+        owner: Optional[_Owner] = None,
+    ) -> None:
+        """Initialize a node."""
+        self.prev: LinkedNode[T] = self if prev_node is None else prev_node
+        self.next: LinkedNode[T] = self if next_node is None else next_node
+        self.data = data
+        # Owner of the list holding the node, None once the node is removed
+        self.owner = owner
+
+
+class BaseLinkedList(MutableSequence[T], Generic[T, H]):
+    """
+    The operations that LinkedList and ArrayLinkedList share.
+
+    The two store their nodes differently, and H is the type of the handle to a
+    node that append and insert return: a LinkedNode, or a slot number.  The
+    methods here only touch nodes through the primitives that each subclass
+    implements, from _item to _nodes.
+    """
+
+    def __init__(
+        self, iterable: Optional[Iterable[T]] = None, maxlen: Optional[int] = None
+    ) -> None:
+        """
+        Initialize linked list object.
+
+        As with collections.deque, if maxlen is given the list holds at most that
+        many items, and adding to one end drops items from the other.
+        """
+        if maxlen is not None and maxlen < 0:
+            raise ValueError("maxlen must be non-negative")
+        self.head: Optional[H] = None
+        self.maxlen = maxlen
+        # Number of items in the list, kept up to date by every edit
+        self._size: int = 0
         if iterable is not None:
-            for item in iterable:
-                self.append(item)
+            self.extend(iterable)
 
     def __repr__(self) -> str:
         """Return repr(self)."""
-        return f"<LinkedList at {hex(id(self.head))}>"
+        return f"<{type(self).__name__} at {hex(id(self.head))}>"
 
     def __str__(self) -> str:
         """Return str(self)."""
@@ -44,83 +104,135 @@ class LinkedList(Generic[T], MutableSequence):
 
     def __len__(self) -> int:
         """Return len(self)."""
-        result: int = 0
-        for item in self:
-            result += 1
-        return result
+        return self._size
 
-    def __iter__(self) -> Optional[Iterator[T]]:
-        """Return iter(self)."""
-        if self.head is None:
-            return None
-        yield self.head.data
-        node = self.head.next
-        while node is not self.head:
-            yield node.data
-            node = node.next
+    @overload
+    def __getitem__(self, i: int) -> T:
+        ...
 
-    def __reversed__(self) -> Iterator[T]:
-        """Return reversed(self)."""
-        node = self.head.prev
-        yield self.head.prev.data
-        while node is not self.head:
-            node = node.prev
-            yield node.data
+    @overload
+    def __getitem__(self: L, i: slice) -> L:
+        ...
 
-    def __getitem__(self, i) -> T:
-        """Return self[i]."""
-        if self.head is None:
-            raise IndexError("LinkedList index out of bounds")
+    def __getitem__(self, i: Union[int, slice]) -> Union[T, "BaseLinkedList[T, H]"]:
+        """Return self[i], or a new list of the same type if i is a slice."""
         if isinstance(i, slice):
-            raise NotImplementedError
-        if i < 0:
-            it = enumerate(reversed(self))
-        else:
-            it = enumerate(iter(self))
-        for j, item in it:
-            if j == i:
-                return item
-        raise IndexError("LinkedList index out of bounds")
+            indices = range(*i.indices(self._size))
+            return type(self)(self._item(node) for node in self._slice_nodes(indices))
+        return self._item(self._node_at(i))
 
-    def __contains__(self, item: T) -> bool:
+    def __contains__(self, item: object) -> bool:
         """Return item in self."""
         for data in self:
             if data == item:
                 return True
         return False
 
-    def __setitem__(self, i, item: Union[T, Iterable[T]]) -> None:
-        """Replace item at position i with item."""
-        raise NotImplementedError
+    @overload
+    def __setitem__(self, i: int, item: T) -> None:
+        ...
 
-    def __delitem__(self, i) -> None:
-        """Remove the item at position i from the list."""
-        raise NotImplementedError
+    @overload
+    def __setitem__(self, i: slice, item: Iterable[T]) -> None:
+        ...
+
+    def __setitem__(self, i: Union[int, slice], item: Any) -> None:
+        """Replace item at position i with item, or the slice i with the items."""
+        if not isinstance(i, slice):
+            self._set_item(self._node_at(i), item)
+            return
+        items = list(item)
+        indices = range(*i.indices(self._size))
+        if indices.step == 1:
+            # Like a list, a simple slice can be replaced by any number of items
+            size = self._size - len(indices) + len(items)
+            if self.maxlen is not None and size > self.maxlen:
+                raise IndexError("LinkedList already at its maximum size")
+            del self[i]
+            position = min(indices.start, self._size)
+            if position == self._size:
+                for data in items:
+                    self.append(data)
+            elif items:
+                node = self._node_at(position)
+                first = self._link_before(node, items[0])
+                for data in items[1:]:
+                    self._link_before(node, data)
+                if position == 0:
+                    self.head = first
+            return
+        if len(items) != len(indices):
+            raise ValueError(
+                f"attempt to assign sequence of size {len(items)} "
+                f"to extended slice of size {len(indices)}"
+            )
+        for node, data in zip(self._slice_nodes(indices), items):
+            self._set_item(node, data)
+
+    def __delitem__(self, i: Union[int, slice]) -> None:
+        """Remove the item at position i, or the items in slice i, from the list."""
+        if not isinstance(i, slice):
+            self._unlink(self._node_at(i))
+            return
+        # Find every node before unlinking any, since unlinking moves the indices
+        for node in list(self._slice_nodes(range(*i.indices(self._size)))):
+            self._unlink(node)
+
+    def __eq__(self, other: object) -> bool:
+        """Return self == other."""
+        if not isinstance(other, BaseLinkedList):
+            return NotImplemented
+        return self._size == other._size and all(a == b for a, b in zip(self, other))
+
+    def __add__(self: L, other: "BaseLinkedList[T, Any]") -> L:
+        """Return self + other."""
+        if not isinstance(other, BaseLinkedList):
+            return NotImplemented
+        result = self.copy()
+        result.extend(other)
+        return result
 
-    def insert(self, i: int, item: T) -> None:
-        """Insert item into list at position i."""
+    def __copy__(self: L) -> L:
+        """Return copy.copy(self)."""
+        return self.copy()
+
+    def copy(self: L) -> L:
+        """Return a shallow copy of the list."""
+        return type(self)(self, self.maxlen)
+
+    def insert(self, i: int, item: T) -> H:  # type: ignore[override]
+        """Insert item into list before position i, and return its node."""
+        if self.maxlen is not None and self._size >= self.maxlen:
+            raise IndexError("LinkedList already at its maximum size")
         if self.head is None:
-            self._add_to_empty(item)
-        elif i == 0:
-            self.appendleft(item)
-        else:
-            for (j, node) in enumerate(self._nodes()):
-                if j == i:
-                    prev_node = node.prev
-                    in_node = self.Node(item, prev_node, node)
-                    prev_node.next = in_node
-                    node.prev = in_node
-
-    # TODO: More mixins for MutableSequence
-
-    def index(self, item: T) -> Union[int, None]:
-        """Return first index where item is stored, or None if it is not in the list."""
-        for i, data in enumerate(self):
-            if data == item:
+            return self._add_to_empty(item)
+        if i < 0:
+            i = max(i + self._size, 0)
+        if i >= self._size:
+            # The spot before the head is the right end
+            return self._link_before(self.head, item)
+        node = self._link_before(self._node_at(i), item)
+        if i == 0:
+            self.head = node
+        return node
+
+    def index(self, item: Any, start: int = 0, stop: Optional[int] = None) -> int:
+        """Return first index of item, raising ValueError if it is not in the list."""
+        indices = range(*slice(start, stop).indices(self._size))
+        for i, node in zip(indices, self._slice_nodes(indices)):
+            if self._item(node) == item:
                 return i
-        return None
+        raise ValueError(f"{item!r} is not in LinkedList")
+
+    def remove(self, item: T) -> None:
+        """Remove the first occurrence of item, raising ValueError if there is none."""
+        for node in self._nodes():
+            if self._item(node) == item:
+                self._unlink(node)
+                return
+        raise ValueError(f"{item!r} is not in LinkedList")
 
-    def count(self, item: T) -> int:
+    def count(self, item: Any) -> int:
         """Return number of times item appears in the list."""
         result: int = 0
         for data in self:
@@ -128,42 +240,702 @@ class LinkedList(Generic[T], MutableSequence):
                 result += 1
         return result
 
-    def append(self, item: T) -> None:
-        """Append `item` to the right end of the list."""
+    def append(self, item: T) -> Optional[H]:  # type: ignore[override]
+        """
+        Append `item` to the right end of the list.
+
+        Return the new node, a handle for remove_node, move_to_front and
+        move_to_end, or None if maxlen is 0.
+        """
+        if self.maxlen == 0:
+            return None
+        if self._size == self.maxlen:
+            self.popleft()
+        if self.head is None:
+            return self._add_to_empty(item)
+        return self._link_before(self.head, item)
+
+    def appendleft(self, item: T) -> Optional[H]:
+        """Append `item` to the left end of the list, and return its new node."""
+        if self.maxlen == 0:
+            return None
+        if self._size == self.maxlen:
+            self.pop()
         if self.head is None:
-            self._add_to_empty(item)
+            return self._add_to_empty(item)
+        self.head = self._link_before(self.head, item)
+        return self.head
+
+    def splice(self: L, other: L, at_node: Optional[H] = None) -> None:
+        """
+        Move all the items of other into self, just before at_node or at the end.
+
+        The nodes of other are linked in as they are, so this takes O(1) and
+        leaves other empty.
+        """
+        if other is self:
+            raise ValueError("cannot splice a LinkedList into itself")
+        if type(other) is not type(self):
+            raise TypeError(f"cannot splice {type(other).__name__} into {type(self)}")
+        if self.maxlen is not None and self._size + other._size > self.maxlen:
+            raise IndexError("LinkedList already at its maximum size")
+        if at_node is not None:
+            self._check_node(at_node)
+        run = self._take_run(other)
+        if run is not None:
+            self._link_run(at_node, *run)
+
+    def split_at(self: L, node: H) -> L:
+        """Cut the list just before node, and return the part from node to the end."""
+        raise NotImplementedError
+
+    def remove_node(self, node: H) -> T:
+        """Remove node, a handle returned by append or insert, and return its item."""
+        self._check_node(node)
+        data = self._item(node)
+        self._unlink(node)
+        return data
+
+    def move_to_front(self, node: H) -> None:
+        """Move node, a handle returned by append or insert, to the left end."""
+        self._check_node(node)
+        if node != self.head:
+            self._detach(node)
+            self._attach_before(self._first_node(), node)
+            self.head = node
+
+    def move_to_end(self, node: H) -> None:
+        """Move node, a handle returned by append or insert, to the right end."""
+        self._check_node(node)
+        if self._size > 1:
+            # Once node is out, the spot before the head is the right end
+            self._detach(node)
+            self._attach_before(self._first_node(), node)
+
+    def extend(self, items: Iterable[T]) -> None:
+        """Append each of items to the right end of the list, as one linked run."""
+        if items is self:
+            items = list(items)
+        if self.maxlen is not None:
+            # Each append may have to drop an item from the left
+            for item in items:
+                self.append(item)
+            return
+        run = self._chain(items)
+        if run is not None:
+            self._link_run(None, *run)
+
+    def extendleft(self, items: Iterable[T]) -> None:
+        """Append each of items to the left end, which reverses their order."""
+        if items is self:
+            items = list(items)
+        for item in items:
+            self.appendleft(item)
+
+    def pop(self, i: int = -1) -> T:
+        """Remove and return the item at position i, by default the last one."""
+        if self.head is None:
+            raise IndexError("pop from an empty LinkedList")
+        node = self._node_at(i)
+        data = self._item(node)
+        self._unlink(node)
+        return data
+
+    def popleft(self) -> T:
+        """Remove and return the item at the left end of the list."""
+        if self.head is None:
+            raise IndexError("pop from an empty LinkedList")
+        node = self.head
+        data = self._item(node)
+        self._unlink(node)
+        return data
+
+    def rotate(self, n: int = 1) -> None:
+        """Rotate the list n steps to the right, or to the left if n is negative."""
+        if self._size > 1:
+            # Moving the head takes min(n, size - n) hops, and moves no items
+            self.head = self._node_at(-n % self._size)
+
+    def _first_node(self) -> H:
+        """Return the node at the left end, raising IndexError if there is none."""
+        if self.head is None:
+            raise IndexError("LinkedList is empty")
+        return self.head
+
+    def _item(self, node: H) -> T:
+        """Return the item held by node."""
+        raise NotImplementedError
+
+    def _set_item(self, node: H, item: T) -> None:
+        """Make node hold item."""
+        raise NotImplementedError
+
+    def _add_to_empty(self, item: T) -> H:
+        """Add `item` to empty list, and return its node."""
+        raise NotImplementedError
+
+    def _chain(self, items: Iterable[T]) -> Optional[Tuple[H, H, int]]:
+        """Link new nodes for items into a run, and return (first, last, count)."""
+        raise NotImplementedError
+
+    def _link_run(self, at_node: Optional[H], first: H, last: H, count: int) -> None:
+        """Link the run of nodes first..last in before at_node, or at the end."""
+        raise NotImplementedError
+
+    def _take_run(self: L, other: L) -> Optional[Tuple[Any, Any, int]]:
+        """Empty other, and return its items as a run (first, last, count) of self."""
+        raise NotImplementedError
+
+    def _check_node(self, node: H) -> None:
+        """Raise ValueError unless node is a handle to a node in self."""
+        raise NotImplementedError
+
+    def _link_before(self, node: H, item: T) -> H:
+        """Insert item just before node, and return its new node."""
+        raise NotImplementedError
+
+    def _unlink(self, node: H) -> None:
+        """Remove node from the list."""
+        raise NotImplementedError
+
+    def _attach_before(self, node: H, new_node: H) -> None:
+        """Link new_node, which is not in the list, in just before node."""
+        raise NotImplementedError
+
+    def _detach(self, node: H) -> None:
+        """Take node out of the list, leaving its own links as they were."""
+        raise NotImplementedError
+
+    def _slice_nodes(self, indices: range) -> Iterator[H]:
+        """Yield the nodes at the positions in indices, a range from a slice."""
+        raise NotImplementedError
+
+    def _node_at(self, i: int) -> H:
+        """Return the node at position i, walking from whichever end is closer."""
+        raise NotImplementedError
+
+    def _nodes(self) -> Iterator[H]:
+        """Iterator over the nodes in the list."""
+        raise NotImplementedError
+
+
+class LinkedList(BaseLinkedList[T, LinkedNode[T]]):
+    """A circular doubly linked list."""
+
+    # Nodes are made through this attribute, so that it can be swapped
+    Node: Type[LinkedNode[Any]] = LinkedNode
+
+    def __init__(
+        self, iterable: Optional[Iterable[T]] = None, maxlen: Optional[int] = None
+    ) -> None:
+        """Initialize linked list object, holding at most maxlen items if given."""
+        # Owner of the nodes in the list, so that handles can be checked
+        self._owner = _Owner(self)
+        super().__init__(iterable, maxlen)
+
+    def __iter__(self) -> Iterator[T]:
+        """Return iter(self)."""
+        head = self.head
+        if head is None:
+            return
+        yield head.data
+        node = head.next
+        while node is not head:
+            yield node.data
+            node = node.next
+
+    def __reversed__(self) -> Iterator[T]:
+        """Return reversed(self)."""
+        head = self.head
+        if head is None:
+            return
+        node = head.prev
+        yield node.data
+        while node is not head:
+            node = node.prev
+            yield node.data
+
+    def split_at(self, node: LinkedNode[T]) -> "LinkedList[T]":
+        """
+        Cut the list just before node, and return the part from node to the end.
+
+        self keeps the items before node.  No items are copied, and counting the
+        items that move takes min(k, n - k) hops for a cut at position k.
+        """
+        self._check_node(node)
+        moved = self._count_from(node)
+        result = type(self)()
+        head = self._first_node()
+        if node is head:
+            result.head, result._size = head, self._size
+            self.head, self._size = None, 0
+            self._owner.list = result
+            result._owner, self._owner = self._owner, _Owner(self)
+            return result
+        last, before = head.prev, node.prev
+        # Record the new owner on whichever part is shorter
+        if moved <= self._size - moved:
+            self._set_owner(node, head, result._owner)
         else:
-            tail = self.head.prev
-            new_tail = self.Node(item, tail, self.head)
-            tail.next = new_tail
-            self.head.prev = new_tail
+            kept = _Owner(self)
+            self._set_owner(head, node, kept)
+            self._owner.list = result
+            result._owner, self._owner = self._owner, kept
+        before.next = head
+        head.prev = before
+        last.next = node
+        node.prev = last
+        result.head, result._size = node, moved
+        self._size -= moved
+        return result
 
-    def appendleft(self, item: T) -> None:
-        """Append `item` to the left end of the list."""
+    def reverse(self) -> None:
+        """Reverse the list in place."""
         if self.head is None:
-            self._add_to_empty(item)
+            return
+        for node in list(self._nodes()):
+            node.prev, node.next = node.next, node.prev
+        self.head = self.head.next
+
+    def clear(self) -> None:
+        """Remove all items from the list."""
+        # The old nodes lose their owner, so that remove_node rejects them
+        self._give_nodes(None)
+        self.head = None
+        self._size = 0
+
+    def _item(self, node: LinkedNode[T]) -> T:
+        """Return the item held by node."""
+        return node.data
+
+    def _set_item(self, node: LinkedNode[T], item: T) -> None:
+        """Make node hold item."""
+        node.data = item
+
+    def _add_to_empty(self, item: T) -> LinkedNode[T]:
+        """Add `item` to empty list, and return its node."""
+        # A node made without neighbours is already a circle of one
+        self.head = self.Node(item, owner=self._owner)
+        self._size = 1
+        return self.head
+
+    def _chain(
+        self, items: Iterable[T]
+    ) -> Optional[Tuple[LinkedNode[T], LinkedNode[T], int]]:
+        """Link new nodes for items into a run, and return (first, last, count)."""
+        Node, owner = self.Node, self._owner
+        it = iter(items)
+        for item in it:
+            first = last = Node(item, owner=owner)
+            break
+        else:
+            return None
+        count = 1
+        for item in it:
+            node = Node(item, last, owner=owner)
+            last.next = node
+            last = node
+            count += 1
+        return first, last, count
+
+    def _link_run(
+        self,
+        at_node: Optional[LinkedNode[T]],
+        first: LinkedNode[T],
+        last: LinkedNode[T],
+        count: int,
+    ) -> None:
+        """Link the run of nodes first..last in before at_node, or at the end."""
+        head = self.head
+        if head is None:
+            first.prev = last
+            last.next = first
+            self.head = first
         else:
-            old_head = self.head
-            self.head = self.Node(item, old_head.prev, old_head)
-            old_head.prev.next = self.head
-            old_head.prev = self.head
-
-    # TODO: more deque operations
-    def _add_to_empty(self, item: T) -> None:
-        """Add `item` to empyt list."""
-        self.head = self.Node(item)
-        self.head.next = self.head
-        self.head.prev = self.head
-
-    def _nodes(self) -> Optional[Iterator["LinkedList"]]:
+            node = head if at_node is None else at_node
+            before = node.prev
+            before.next = first
+            first.prev = before
+            last.next = node
+            node.prev = last
+            if at_node is head:
+                self.head = first
+        self._size += count
+
+    def _take_run(
+        self, other: "LinkedList[T]"
+    ) -> Optional[Tuple[LinkedNode[T], LinkedNode[T], int]]:
+        """Empty other, and return its nodes as a run (first, last, count)."""
+        head = other.head
+        if head is None:
+            return None
+        run = head, head.prev, other._size
+        other.head, other._size = None, 0
+        other._give_nodes(self)
+        return run
+
+    def _give_nodes(self, new_list: Optional["LinkedList[T]"]) -> None:
+        """Make the nodes of self belong to new_list, or to no list if None."""
+        self._owner.list = None
+        if new_list is not None:
+            self._owner.forward = new_list._owner
+        self._owner = _Owner(self)
+
+    @staticmethod
+    def _set_owner(first: LinkedNode[T], stop: LinkedNode[T], owner: _Owner) -> None:
+        """Make owner the owner of the nodes from first up to, but not, stop."""
+        node = first
+        while True:
+            node.owner = owner
+            node = node.next
+            if node is stop:
+                break
+
+    def _count_from(self, node: LinkedNode[T]) -> int:
+        """Return the number of nodes from node to the end of the list."""
+        # Walk both ways at once, and stop at whichever end comes first
+        forward = backward = node
+        steps = 0
+        while True:
+            if backward is self.head:
+                return self._size - steps
+            if forward.next is self.head:
+                return steps + 1
+            forward = forward.next
+            backward = backward.prev
+            steps += 1
+
+    def _check_node(self, node: LinkedNode[T]) -> None:
+        """Raise ValueError unless node is a handle to a node in self."""
+        if self._owner_of(node) is not self:
+            raise ValueError("node is not in this LinkedList")
+
+    @staticmethod
+    def _owner_of(node: LinkedNode[T]) -> Optional["LinkedList[Any]"]:
+        """Return the list that node belongs to, or None if it was removed."""
+        owner = node.owner
+        if owner is None:
+            return None
+        while owner.forward is not None:
+            owner = owner.forward
+        # Point the node straight at the end of the chain for next time
+        node.owner = owner
+        return owner.list
+
+    def _link_before(self, node: LinkedNode[T], item: T) -> LinkedNode[T]:
+        """Insert item just before node, and return its new node."""
+        new_node = self.Node(item, owner=self._owner)
+        self._attach_before(node, new_node)
+        return new_node
+
+    def _unlink(self, node: LinkedNode[T]) -> None:
+        """Remove node from the list."""
+        self._detach(node)
+        # Drop the node's links and owner, so that remove_node can reject it
+        node.prev = node.next = node
+        node.owner = None
+
+    def _attach_before(self, node: LinkedNode[T], new_node: LinkedNode[T]) -> None:
+        """Link new_node, which is not in the list, in just before node."""
+        prev_node = node.prev
+        new_node.prev = prev_node
+        new_node.next = node
+        prev_node.next = new_node
+        node.prev = new_node
+        self._size += 1
+
+    def _detach(self, node: LinkedNode[T]) -> None:
+        """Take node out of the list, leaving its own links as they were."""
+        if self._size == 1:
+            self.head = None
+        else:
+            node.prev.next = node.next
+            node.next.prev = node.prev
+            if node is self.head:
+                self.head = node.next
+        self._size -= 1
+
+    def _slice_nodes(self, indices: range) -> Iterator[LinkedNode[T]]:
+        """Yield the nodes at the positions in indices, a range from a slice."""
+        if not indices:
+            return
+        node = self._node_at(indices[0])
+        hops = abs(indices.step)
+        yield node
+        for _ in range(len(indices) - 1):
+            for _ in range(hops):
+                node = node.next if indices.step > 0 else node.prev
+            yield node
+
+    def _node_at(self, i: int) -> LinkedNode[T]:
+        """Return the node at position i, walking from whichever end is closer."""
+        if i < 0:
+            i += self._size
+        node = self.head
+        if node is None or not 0 <= i < self._size:
+            raise IndexError("LinkedList index out of bounds")
+        if i <= self._size // 2:
+            for _ in range(i):
+                node = node.next
+        else:
+            for _ in range(self._size - i):
+                node = node.prev
+        return node
+
+    def _nodes(self) -> Iterator[LinkedNode[T]]:
         """Iterator over the nodes in the list."""
+        head = self.head
+        if head is None:
+            return
+        yield head
+        node = head.next
+        while node is not head:
+            yield node
+            node = node.next
+
+
+class ArrayLinkedList(BaseLinkedList[T, int]):
+    """
+    A circular doubly linked list stored in arrays instead of Node objects.
+
+    A node is an index into three parallel arrays holding the previous and next
+    indices and the data, so an element costs three array slots rather than an
+    object.  Removed slots go on a free list, threaded through the data array, and
+    are reused by later inserts; the arrays double in size when it runs out.  So
+    unlike with LinkedList, a handle must not be used again once its node is
+    removed, since the slot may hold another node by then.
+    """
+
+    def __init__(
+        self,
+        iterable: Optional[Iterable[T]] = None,
+        maxlen: Optional[int] = None,
+        capacity: int = 16,
+    ) -> None:
+        """Initialize linked list object with room for capacity items."""
+        self._prev = array("q")
+        self._next = array("q")
+        # The items, and the next free slot in each free slot
+        self._data: List[Any] = []
+        # First free slot, -1 if there is none
+        self._free = -1
+        if isinstance(iterable, Sized):
+            capacity = max(capacity, len(iterable))
+        self._grow(max(capacity, 1))
+        super().__init__(iterable, maxlen)
+
+    def __iter__(self) -> Iterator[T]:
+        """Return iter(self)."""
+        data = self._data
+        return (data[node] for node in self._nodes())
+
+    def __reversed__(self) -> Iterator[T]:
+        """Return reversed(self)."""
+        node = self.head
+        if node is None:
+            return
+        prev, data = self._prev, self._data
+        for _ in range(self._size):
+            node = prev[node]
+            yield data[node]
+
+    def split_at(self, node: int) -> "ArrayLinkedList[T]":
+        """
+        Cut the list just before node, and return the part from node to the end.
+
+        The part that moves gets its own arrays, so unlike with LinkedList its
+        items are moved one slot at a time.
+        """
+        self._check_node(node)
+        moving = []
+        while True:
+            moving.append(node)
+            node = self._next[node]
+            if node == self.head:
+                break
+        result = type(self)(self._data[node] for node in moving)
+        for node in moving:
+            self._unlink(node)
+        return result
+
+    def reverse(self) -> None:
+        """Reverse the list in place, by swapping the prev and next arrays."""
         if self.head is None:
+            return
+        self._prev, self._next = self._next, self._prev
+        self.head = self._next[self.head]
+
+    def clear(self) -> None:
+        """Remove all items from the list, keeping the arrays for reuse."""
+        for node in list(self._nodes()):
+            self._release(node)
+        self.head = None
+        self._size = 0
+
+    def _item(self, node: int) -> T:
+        """Return the item held by node."""
+        return self._data[node]
+
+    def _set_item(self, node: int, item: T) -> None:
+        """Make node hold item."""
+        self._data[node] = item
+
+    def _add_to_empty(self, item: T) -> int:
+        """Add `item` to empty list, and return its node."""
+        node = self._allocate(item)
+        self._prev[node] = self._next[node] = node
+        self.head = node
+        self._size = 1
+        return node
+
+    def _chain(self, items: Iterable[T]) -> Optional[Tuple[int, int, int]]:
+        """Link new nodes for items into a run, and return (first, last, count)."""
+        it = iter(items)
+        for item in it:
+            first = last = self._allocate(item)
+            break
+        else:
             return None
-        yield self.head
-        node = self.head.next
-        while node is not self.head:
+        count = 1
+        prev, next_ = self._prev, self._next
+        for item in it:
+            node = self._allocate(item)
+            next_[last] = node
+            prev[node] = last
+            last = node
+            count += 1
+        return first, last, count
+
+    def _link_run(
+        self, at_node: Optional[int], first: int, last: int, count: int
+    ) -> None:
+        """Link the run of nodes first..last in before at_node, or at the end."""
+        if self.head is None:
+            self._prev[first] = last
+            self._next[last] = first
+            self.head = first
+        else:
+            node = self.head if at_node is None else at_node
+            before = self._prev[node]
+            self._next[before] = first
+            self._prev[first] = before
+            self._next[last] = node
+            self._prev[node] = last
+            if at_node == self.head:
+                self.head = first
+        self._size += count
+
+    def _take_run(self, other: "ArrayLinkedList[T]") -> Optional[Tuple[int, int, int]]:
+        """Empty other, and return its items in new nodes of self as a run."""
+        run = self._chain(other)
+        other.clear()
+        return run
+
+    def _check_node(self, node: int) -> None:
+        """
+        Raise ValueError if node is not the slot of a node in the list.
+
+        A slot number does not say which list it came from, so unlike with
+        LinkedList a handle from another ArrayLinkedList is not caught.
+        """
+        if not 0 <= node < len(self._data) or self._next[node] < 0:
+            raise ValueError("node is not in the ArrayLinkedList")
+
+    def _link_before(self, node: int, item: T) -> int:
+        """Insert item just before node, and return its new node."""
+        new_node = self._allocate(item)
+        self._attach_before(node, new_node)
+        return new_node
+
+    def _unlink(self, node: int) -> None:
+        """Remove node from the list, and put its slot on the free list."""
+        self._detach(node)
+        self._release(node)
+
+    def _attach_before(self, node: int, new_node: int) -> None:
+        """Link new_node, which is not in the list, in just before node."""
+        prev_node = self._prev[node]
+        self._prev[new_node] = prev_node
+        self._next[new_node] = node
+        self._next[prev_node] = new_node
+        self._prev[node] = new_node
+        self._size += 1
+
+    def _detach(self, node: int) -> None:
+        """Take node out of the list, leaving its own links as they were."""
+        if self._size == 1:
+            self.head = None
+        else:
+            prev_node, next_node = self._prev[node], self._next[node]
+            self._next[prev_node] = next_node
+            self._prev[next_node] = prev_node
+            if node == self.head:
+                self.head = next_node
+        self._size -= 1
+
+    def _allocate(self, item: T) -> int:
+        """Take a slot from the free list, growing the arrays if needed, for item."""
+        if self._free < 0:
+            self._grow(len(self._data))
+        node = self._free
+        self._free = self._data[node]
+        self._data[node] = item
+        return node
+
+    def _release(self, node: int) -> None:
+        """Put the slot of a removed node on the free list."""
+        # Free slots link to -1, so that _check_node can tell them apart
+        self._prev[node] = self._next[node] = -1
+        self._data[node] = self._free
+        self._free = node
+
+    def _grow(self, n: int) -> None:
+        """Add n free slots to the arrays."""
+        start = len(self._data)
+        self._prev.extend(array("q", [-1]) * n)
+        self._next.extend(array("q", [-1]) * n)
+        # Thread the new slots onto the front of the free list
+        self._data.extend(range(start + 1, start + n))
+        self._data.append(self._free)
+        self._free = start
+
+    def _slice_nodes(self, indices: range) -> Iterator[int]:
+        """Yield the nodes at the positions in indices, a range from a slice."""
+        if not indices:
+            return
+        links = self._next if indices.step > 0 else self._prev
+        node = self._node_at(indices[0])
+        hops = abs(indices.step)
+        yield node
+        for _ in range(len(indices) - 1):
+            for _ in range(hops):
+                node = links[node]
             yield node
-            node = node.next
+
+    def _node_at(self, i: int) -> int:
+        """Return the node at position i, walking from whichever end is closer."""
+        if i < 0:
+            i += self._size
+        node = self.head
+        if node is None or not 0 <= i < self._size:
+            raise IndexError("LinkedList index out of bounds")
+        if i <= self._size // 2:
+            links, hops = self._next, i
+        else:
+            links, hops = self._prev, self._size - i
+        for _ in range(hops):
+            node = links[node]
+        return node
+
+    def _nodes(self) -> Iterator[int]:
+        """Iterator over the nodes in the list."""
+        node = self.head
+        if node is None:
+            return
+        links = self._next
+        for _ in range(self._size):
+            yield node
+            node = links[node]
 
 
 if __name__ == "__main__":
@@ -171,3 +943,63 @@ if __name__ == "__main__":
     lst = LinkedList([1, 2, 3, 4, 5])
     for node in lst:
         print(node)
+
+    # Compare memory per element with and without __slots__.
+    from pyutils import allocated_bytes, without_slots  # type: ignore
+
+    N = 10 ** 5
+    slotted = LinkedList.Node
+    for label, node_class in [("without", without_slots(slotted)), ("with", slotted)]:
+        LinkedList.Node = node_class  # type: ignore
+        size = allocated_bytes(lambda: LinkedList(range(N)))
+        print(f"LinkedList {label} __slots__: {size / N:.1f} bytes per element")
+
+    # Compare deque operations with collections.deque and list.
+    from collections import deque
+    from timer import Timer  # type: ignore
+
+    LinkedList.Node = slotted  # type: ignore
+    N = 10 ** 5
+    for cls in (LinkedList, deque, list):
+        name = cls.__name__
+        seq: Any = cls(range(N))
+        with Timer(name=f"{name}: {N} append + popleft"):
+            for i in range(N):
+                seq.append(i)
+                seq.pop(0) if cls is list else seq.popleft()
+        with Timer(name=f"{name}: {N} appendleft + pop"):
+            for i in range(N):
+                seq.insert(0, i) if cls is list else seq.appendleft(i)
+                seq.pop()
+        with Timer(name=f"{name}: 1000 reads at random positions"):
+            for i in range(1000):
+                seq[(i * 7919) % N]
+        if cls is not list:
+            with Timer(name=f"{name}: 1000 rotations by N / 3"):
+                for _ in range(1000):
+                    seq.rotate(N // 3)
+
+    # Compare node objects with array storage: memory per element, and the time
+    # to churn through appends and poplefts that allocate and free a node each.
+    for cls in (LinkedList, ArrayLinkedList):  # type: ignore
+        name = cls.__name__
+        size = allocated_bytes(lambda: cls([None] * N))
+        print(f"{name}: {size / N:.1f} bytes per element")
+        seq = cls(range(1000))
+        with Timer(name=f"{name}: {10 * N} append + popleft"):
+            for i in range(10 * N):
+                seq.append(i)
+                seq.popleft()
+
+    # Merge per-worker result lists: splice links each one in as it is, while
+    # extending with the items copies them into new nodes.
+    for cls in (LinkedList, ArrayLinkedList):  # type: ignore
+        name = cls.__name__
+        with Timer(name=f"{name}: build from {10 * N} items"):
+            cls(range(10 * N))
+        for merge in ("extend", "splice"):
+            parts = [cls(range(N)) for _ in range(10)]
+            merged: Any = cls()
+            with Timer(name=f"{name}: {merge} 10 lists of {N}"):
+                for part in parts:
+                    getattr(merged, merge)(part)
@@ -0,0 +1,275 @@
+"""linkedqueue.py: Implements thread safe and asyncio queues on a LinkedList."""
+# Standard Library
+import asyncio
+from queue import Empty, Full
+import threading
+from typing import Generic, List, Optional, TypeVar
+
+# Third party libraries
+
+# Local imports
+from cs101.linkedlist import LinkedList
+
+T = TypeVar("T")
+
+
+class LinkedQueue(Generic[T]):
+    """
+    A first in, first out queue for passing items between threads.
+
+    The items are kept in a LinkedList guarded by one lock, with a
+    threading.Condition on it for each of "not empty" and "not full", as in
+    queue.Queue.  If maxsize is positive, put blocks while the queue holds
+    maxsize items, so that a fast producer waits for its consumers.  get_many
+    takes a batch of items for one acquisition of the lock.
+    """
+
+    def __init__(self, maxsize: int = 0) -> None:
+        """Initialize an empty queue; maxsize <= 0 means no bound on its size."""
+        self.maxsize = maxsize
+        self._items: LinkedList[T] = LinkedList()
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+
+    def __repr__(self) -> str:
+        """Return repr(self)."""
+        return f"LinkedQueue(maxsize={self.maxsize}, qsize={self.qsize()})"
+
+    def qsize(self) -> int:
+        """Return the number of items in the queue."""
+        with self._lock:
+            return len(self._items)
+
+    def empty(self) -> bool:
+        """Return True if the queue is empty."""
+        with self._lock:
+            return not self._items
+
+    def full(self) -> bool:
+        """Return True if the queue holds maxsize items."""
+        with self._lock:
+            return self._full()
+
+    def put(self, item: T, block: bool = True, timeout: Optional[float] = None) -> None:
+        """
+        Put item at the back of the queue.
+
+        If the queue is full, wait up to timeout seconds (forever if None) for a
+        free place, and raise queue.Full if there is none.  With block=False,
+        raise queue.Full at once.
+        """
+        with self._not_full:
+            if self._full():
+                if not block or not self._not_full.wait_for(
+                    lambda: not self._full(), timeout
+                ):
+                    raise Full
+            self._items.append(item)
+            self._not_empty.notify()
+
+    def get(self, block: bool = True, timeout: Optional[float] = None) -> T:
+        """
+        Remove and return the item at the front of the queue.
+
+        If the queue is empty, wait up to timeout seconds (forever if None) for
+        an item, and raise queue.Empty if there is none.  With block=False, raise
+        queue.Empty at once.
+        """
+        with self._not_empty:
+            self._wait_for_items(block, timeout)
+            item = self._items.popleft()
+            self._not_full.notify()
+            return item
+
+    def get_many(
+        self, n: int, block: bool = True, timeout: Optional[float] = None
+    ) -> List[T]:
+        """
+        Remove and return up to n items from the front of the queue, oldest first.
+
+        This waits, as get does, only until there is at least one item.
+        """
+        if n < 1:
+            raise ValueError("n must be at least 1")
+        with self._not_empty:
+            self._wait_for_items(block, timeout)
+            items = self._items
+            batch = [items.popleft() for _ in range(min(n, len(items)))]
+            self._not_full.notify(len(batch))
+            return batch
+
+    def put_nowait(self, item: T) -> None:
+        """Put item in the queue if there is room at once, else raise queue.Full."""
+        self.put(item, block=False)
+
+    def get_nowait(self) -> T:
+        """Remove and return an item if one is there, else raise queue.Empty."""
+        return self.get(block=False)
+
+    def _full(self) -> bool:
+        """Return True if the queue holds maxsize items; the lock must be held."""
+        return 0 < self.maxsize <= len(self._items)
+
+    def _wait_for_items(self, block: bool, timeout: Optional[float]) -> None:
+        """Wait as get does for the queue to have an item; the lock must be held."""
+        if not self._items:
+            if not block or not self._not_empty.wait_for(
+                lambda: bool(self._items), timeout
+            ):
+                raise Empty
+
+
+class AsyncLinkedQueue(Generic[T]):
+    """
+    A first in, first out queue for passing items between asyncio tasks.
+
+    put, get and get_many are coroutines that suspend the calling task, instead
+    of blocking the thread, until there is room or an item; use asyncio.wait_for
+    to put a timeout on them.  A task runs undisturbed between awaits, so the
+    queue needs no lock: an asyncio.Event for each of "not empty" and "not full"
+    wakes the waiting tasks, and each of them checks again before going on.  The
+    events are made on the first wait, inside the running loop, since before
+    Python 3.10 an Event binds to the loop current when it is made; so the queue
+    may be built before asyncio.run.  As with asyncio.Queue, the queue is not
+    thread safe.
+    """
+
+    def __init__(self, maxsize: int = 0) -> None:
+        """Initialize an empty queue; maxsize <= 0 means no bound on its size."""
+        self.maxsize = maxsize
+        self._items: LinkedList[T] = LinkedList()
+        self._not_empty: Optional[asyncio.Event] = None
+        self._not_full: Optional[asyncio.Event] = None
+
+    def __repr__(self) -> str:
+        """Return repr(self)."""
+        return f"AsyncLinkedQueue(maxsize={self.maxsize}, qsize={self.qsize()})"
+
+    def qsize(self) -> int:
+        """Return the number of items in the queue."""
+        return len(self._items)
+
+    def empty(self) -> bool:
+        """Return True if the queue is empty."""
+        return not self._items
+
+    def full(self) -> bool:
+        """Return True if the queue holds maxsize items."""
+        return 0 < self.maxsize <= len(self._items)
+
+    async def put(self, item: T) -> None:
+        """Put item at the back of the queue, waiting for a free place if full."""
+        while self.full():
+            if self._not_full is None:
+                self._not_full = asyncio.Event()
+            self._not_full.clear()
+            await self._not_full.wait()
+        self.put_nowait(item)
+
+    async def get(self) -> T:
+        """Remove and return the item at the front, waiting for one if empty."""
+        await self._wait_for_items()
+        return self.get_nowait()
+
+    async def get_many(self, n: int) -> List[T]:
+        """
+        Remove and return up to n items from the front of the queue, oldest first.
+
+        This waits, as get does, only until there is at least one item.
+        """
+        if n < 1:
+            raise ValueError("n must be at least 1")
+        await self._wait_for_items()
+        items = self._items
+        batch = [items.popleft() for _ in range(min(n, len(items)))]
+        if self._not_full is not None:
+            self._not_full.set()
+        return batch
+
+    def put_nowait(self, item: T) -> None:
+        """Put item in the queue if it is not full, else raise asyncio.QueueFull."""
+        if self.full():
+            raise asyncio.QueueFull
+        self._items.append(item)
+        if self._not_empty is not None:
+            self._not_empty.set()
+
+    def get_nowait(self) -> T:
+        """Remove and return an item if there is one, else raise asyncio.QueueEmpty."""
+        if not self._items:
+            raise asyncio.QueueEmpty
+        item = self._items.popleft()
+        if self._not_full is not None:
+            self._not_full.set()
+        return item
+
+    async def _wait_for_items(self) -> None:
+        """Wait until the queue has an item."""
+        while not self._items:
+            if self._not_empty is None:
+                self._not_empty = asyncio.Event()
+            self._not_empty.clear()
+            await self._not_empty.wait()
+
+
+if __name__ == "__main__":
+    # Compare throughput with queue.Queue and asyncio.Queue: one producer and one
+    # consumer pass N items through a queue bounded at 1000, and the consumer
+    # either gets them one at a time or in batches of 100.  Run this from the
+    # repository root with `python -m cs101.linkedqueue`.
+    import queue
+
+    from cs101.timer import Timer
+
+    N = 10 ** 5
+
+    def produce(q) -> None:
+        for i in range(N):
+            q.put(i)
+
+    def consume(q, batch: int) -> None:
+        count = 0
+        while count < N:
+            if batch > 1:
+                count += len(q.get_many(batch))
+            else:
+                q.get()
+                count += 1
+
+    for name, cls, batch in [
+        ("queue.Queue", queue.Queue, 1),
+        ("LinkedQueue", LinkedQueue, 1),
+        ("LinkedQueue", LinkedQueue, 100),
+    ]:
+        q = cls(1000)
+        producer = threading.Thread(target=produce, args=(q,))
+        with Timer(name=f"{name}: {N} items, batch {batch}"):
+            producer.start()
+            consume(q, batch)
+            producer.join()
+
+    async def produce_async(q) -> None:
+        for i in range(N):
+            await q.put(i)
+
+    async def consume_async(q, batch: int) -> None:
+        count = 0
+        while count < N:
+            if batch > 1:
+                count += len(await q.get_many(batch))
+            else:
+                await q.get()
+                count += 1
+
+    async def run(cls, batch: int) -> None:
+        q = cls(1000)
+        await asyncio.gather(produce_async(q), consume_async(q, batch))
+
+    for name, cls, batch in [
+        ("asyncio.Queue", asyncio.Queue, 1),
+        ("AsyncLinkedQueue", AsyncLinkedQueue, 1),
+        ("AsyncLinkedQueue", AsyncLinkedQueue, 100),
+    ]:
+        with Timer(name=f"{name}: {N} items, batch {batch}"):
+            asyncio.run(run(cls, batch))
@@ -0,0 +1,97 @@
+"""lrucache.py: Implements a bounded least recently used cache."""
+# Standard Library
+from collections.abc import Hashable
+from typing import Any, cast, Dict, Iterator, MutableMapping, Tuple, TypeVar
+
+# Third party libraries
+
+# Local imports
+from cs101.linkedlist import LinkedList, LinkedNode
+
+K = TypeVar("K", bound=Hashable)
+
+
+class LRUCache(MutableMapping[K, Any]):
+    """
+    A mapping that holds at most maxsize items, evicting the least recently used.
+
+    The items are kept in a LinkedList from least to most recently used, and a
+    dict maps each key to its node, so a lookup, an update and an eviction each
+    take O(1).  Reading or setting a key makes it the most recently used;
+    `key in cache` does not.  The hits, misses and evictions attributes count
+    lookups that found their key, lookups that did not, and items evicted.
+    """
+
+    def __init__(self, maxsize: int = 128) -> None:
+        """Initialize an empty cache holding at most maxsize items."""
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # (key, value) pairs, least recently used first
+        self._order: LinkedList[Tuple[K, Any]] = LinkedList()
+        self._nodes: Dict[K, LinkedNode[Tuple[K, Any]]] = {}
+
+    def __repr__(self) -> str:
+        """Return repr(self)."""
+        return (
+            f"LRUCache(maxsize={self.maxsize}, currsize={len(self)}, "
+            f"hits={self.hits}, misses={self.misses}, evictions={self.evictions})"
+        )
+
+    def __getitem__(self, key: K) -> Any:
+        """Return self[key], and mark key as the most recently used."""
+        try:
+            node = self._nodes[key]
+        except KeyError:
+            self.misses += 1
+            raise
+        self.hits += 1
+        self._order.move_to_end(node)
+        return node.data[1]
+
+    def __setitem__(self, key: K, value: Any) -> None:
+        """Set self[key] = value, evicting the least recently used key if full."""
+        node = self._nodes.get(key)
+        if node is not None:
+            node.data = key, value
+            self._order.move_to_end(node)
+            return
+        if len(self._nodes) >= self.maxsize:
+            old_key, _ = self._order.popleft()
+            del self._nodes[old_key]
+            self.evictions += 1
+        # append only returns None for a list with maxlen=0
+        node = self._order.append((key, value))
+        self._nodes[key] = cast(LinkedNode[Tuple[K, Any]], node)
+
+    def __delitem__(self, key: K) -> None:
+        """del self[key]."""
+        self._order.remove_node(self._nodes.pop(key))
+
+    def __contains__(self, key: Any) -> bool:
+        """Return key in self, without marking key as used."""
+        return key in self._nodes
+
+    def __iter__(self) -> Iterator[K]:
+        """Return an iterator over the keys, least recently used first."""
+        return (key for key, _ in self._order)
+
+    def __len__(self) -> int:
+        """Return len(self)."""
+        return len(self._nodes)
+
+    def items(self) -> Iterator[Tuple[K, Any]]:  # type: ignore
+        """Return an iterator over key, value tuples, without marking keys as used."""
+        return iter(self._order)
+
+    def values(self) -> Iterator[Any]:  # type: ignore
+        """Return an iterator over the values, without marking keys as used."""
+        return (value for _, value in self._order)
+
+    def clear(self) -> None:
+        """Remove all items from the cache, keeping the counters."""
+        self._order.clear()
+        self._nodes.clear()
@@ -2,8 +2,9 @@
 import csv
 import random
 import string
+import tracemalloc
 from collections import defaultdict
-from typing import Dict, List, Sequence
+from typing import Any, Callable, Dict, List, Sequence
 
 
 def argmin(sequence: Sequence) -> int:
@@ -31,3 +32,25 @@ def csv_read_columns(csvfile: str) -> Dict[str, List[str]]:
             for key, item in zip(keys, row):
                 table[key].append(item)
     return dict(table)
+
+
+def allocated_bytes(build: Callable[[], Any]) -> int:
+    """Return the number of bytes allocated by build() still held when it returns."""
+    tracemalloc.start()
+    try:
+        result = build()  # noqa: F841 keep the result alive while measuring
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return size
+
+
+def without_slots(cls: type) -> type:
+    """Return a copy of cls which keeps its attributes in a __dict__, not __slots__."""
+    slots = set(vars(cls).get("__slots__", ()))
+    namespace = {
+        name: value
+        for name, value in vars(cls).items()
+        if name not in slots | {"__slots__", "__dict__", "__weakref__"}
+    }
+    return type(cls)(cls.__name__, cls.__bases__, namespace)
@@ -3,84 +3,396 @@ rope.py: Immutable sequence type to efficiently operate on long strings.
 
 TODO:
     MINIMAL:
-    substring search
     ---------------------
     EXPANSIONS:
-    add support for bytes
-    make __getitem__ return a rope instead of str
-    caching for faster __getitem__
     More of the string operations
 """
 # standard library
 import itertools as it
-import operator as op
-from collections import deque
+import mmap
+import os
 from collections.abc import Sequence
-from math import sqrt
-from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+from functools import lru_cache
+from typing import (
+    Any,
+    AnyStr,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+    cast,
+    overload,
+)
 
 # third party libraries
-import more_itertools as mit
 
 # local modules
 
 # Type aliases
-Stringy = Union[str, "Rope"]  # add bytes?
+Bytes = Union[bytes, bytearray, memoryview]
+Stringy = Union[str, Bytes, "Rope"]
+Piece = Union[str, memoryview, "_MappedText"]
+# A pattern to search for: an int stands for one byte, as with bytes.find
+Needle = Union[Stringy, int]
+
+# Rebalancing policies
+EAGER = "eager"  # rebalance after any edit that leaves the rope unbalanced
+LAZY = "lazy"  # rebalance only once an unbalanced rope is also too deep
+NEVER = "never"  # only rebalance when _rebalance() is called explicitly
+
+
+def _fibonacci(limit: int) -> Tuple[int, ...]:
+    """Return the Fibonacci numbers F(0), F(1), ... up to the first one above limit."""
+    fibs = [0, 1]
+    while fibs[-1] <= limit:
+        fibs.append(fibs[-1] + fibs[-2])
+    return tuple(fibs)
+
+
+# Longer than any rope can be, so _FIBS[depth + 2] is defined for any balanced rope
+_FIBS = _fibonacci(2 ** 64)
+
+
+class RopeConfig(NamedTuple):
+    """
+    Tuning parameters shared by every node of a Rope.
+
+    Long strings are split into leaves of max_leaf_len characters, and adjacent
+    leaves are merged whenever their combined length is at most min_leaf_len.
+    """
+
+    rebalance: str = LAZY
+    min_leaf_len: int = 512
+    max_leaf_len: int = 10000
+
+
+class _MappedText(object):
+    """
+    A lazily decoded slice of a memory-mapped file, used as the text of a Rope leaf.
+
+    Only single-byte encodings are supported so that character offsets and byte
+    offsets coincide: len() and slicing never read the underlying file.
+    """
+
+    __slots__ = ("_map", "_start", "_stop", "_encoding")
+
+    def __init__(self, buf: mmap.mmap, start: int, stop: int, encoding: str) -> None:
+        """Initialize a view of buf[start:stop]."""
+        self._map = buf
+        self._start = start
+        self._stop = stop
+        self._encoding = encoding
+
+    def __str__(self) -> str:
+        """Return the decoded text, reading it from the file."""
+        return self._map[self._start : self._stop].decode(self._encoding)
+
+    def __len__(self) -> int:
+        """Return len(self)."""
+        return self._stop - self._start
+
+    def __getitem__(self, i: Union[int, slice]) -> Piece:
+        """Return self[i].  Slices are views and do not read the file."""
+        if isinstance(i, slice):
+            start, stop, step = i.indices(len(self))
+            if step != 1:
+                return str(self)[i]
+            stop = max(start, stop)
+            return _MappedText(
+                self._map, self._start + start, self._start + stop, self._encoding
+            )
+        if i < 0:
+            i += len(self)
+        if i < 0 or i >= len(self):
+            raise IndexError("_MappedText index out of range")
+        j = self._start + i
+        return self._map[j : j + 1].decode(self._encoding)
+
+    def __iter__(self) -> Iterator[str]:
+        """Return iter(self)."""
+        return iter(str(self))
+
+    def __reversed__(self) -> Iterator[str]:
+        """Return reversed(self)."""
+        return reversed(str(self))
+
+
+def _readable(piece: Piece) -> Union[str, memoryview]:
+    """Return piece as str, or a memoryview for binary leaves, decoding mapped text."""
+    return piece if isinstance(piece, memoryview) else str(piece)
+
+
+def _flatten(piece: Piece) -> Union[str, bytes]:
+    """Return the contents of a leaf piece as str, or bytes for binary leaves."""
+    if isinstance(piece, memoryview):
+        return piece.tobytes()
+    return str(piece)
+
+
+def _concat(pieces: List[Union[str, memoryview]]) -> Union[str, memoryview]:
+    """Return the concatenation of pieces, which are all str or all memoryview."""
+    if len(pieces) == 1:
+        return pieces[0]
+    if isinstance(pieces[0], str):
+        return "".join(cast(List[str], pieces))
+    return memoryview(b"".join(cast(List[memoryview], pieces)))
+
+
+def _text_of(piece: Piece) -> str:
+    """Return a text leaf piece as str to search for a str; binary leaves can't be."""
+    if isinstance(piece, memoryview):
+        raise TypeError("argument should be a bytes-like object, not 'str'")
+    return str(piece)
+
+
+def _bytes_of(piece: Piece) -> bytes:
+    """Return a binary leaf piece as bytes to search for bytes; text leaves can't be."""
+    if not isinstance(piece, memoryview):
+        raise TypeError("must be str, not bytes")
+    return piece.tobytes()
+
+
+def _rfind_chunks(chunks: Iterable[AnyStr], sub: AnyStr, end: int) -> int:
+    """
+    Return the index of the last match of sub in chunks, or -1 if there is none.
+
+    chunks run backwards from index end, and sub must not be empty.
+    """
+    m = len(sub)
+    # head holds the first m - 1 characters following the current chunk
+    head = sub[:0]
+    pos = end
+    for chunk in chunks:
+        pos -= len(chunk)
+        if head:
+            # Any match in window must start in chunk since len(head) < m
+            edge = chunk[-(m - 1) :]
+            i = (edge + head).rfind(sub)
+            if i != -1:
+                return pos + len(chunk) - len(edge) + i
+        i = chunk.rfind(sub)
+        if i != -1:
+            return pos + i
+        if m > 1:
+            if len(chunk) >= m - 1:
+                head = chunk[: m - 1]
+            else:
+                head = (chunk + head)[: m - 1]
+    return -1
+
+
+def _find_chunks(chunks: Iterable[AnyStr], sub: AnyStr, start: int) -> Iterator[int]:
+    """
+    Iterate over the indices of non-overlapping matches of sub in chunks.
+
+    chunks run forwards from index start, and sub must not be empty.
+    """
+    m = len(sub)
+    # tail holds the text in [pos - len(tail), pos) where a match may still begin
+    tail = sub[:0]
+    pos = start
+    resume = start  # earliest index where the next match may begin
+    for chunk in chunks:
+        if tail:
+            tail_pos = pos - len(tail)
+            window = tail + chunk[: m - 1]
+            i = window.find(sub, max(resume - tail_pos, 0))
+            while i != -1 and i < len(tail):
+                yield tail_pos + i
+                resume = tail_pos + i + m
+                i = window.find(sub, i + m)
+        i = chunk.find(sub, max(resume - pos, 0))
+        while i != -1:
+            yield pos + i
+            resume = pos + i + m
+            i = chunk.find(sub, i + m)
+        pos += len(chunk)
+        if m > 1:
+            if len(chunk) >= m - 1:
+                tail = chunk[len(chunk) - (m - 1) :]
+            else:
+                tail = (tail + chunk)[-(m - 1) :]
+
+
+@lru_cache(maxsize=None)
+def _is_single_byte(encoding: str) -> bool:
+    """Does every pair of bytes decode to exactly two characters in encoding?"""
+    return all(
+        len(bytes(pair).decode(encoding, errors="replace")) == 2
+        for pair in it.product(range(256), repeat=2)
+    )
 
 
 class Rope(Sequence):
     """
     Rope(object='') -> Rope.
 
-    Create a new Rope object from the given object.
+    Create a new Rope object from the given object.  A bytes-like object gives a
+    binary rope whose leaves are memoryview slices sharing the object's buffer, so
+    a mutable buffer such as a bytearray must not be modified while it is in use.
     """
 
+    __slots__ = (
+        "_left",
+        "_right",
+        "_text",
+        "_weight",
+        "_len",
+        "_depth",
+        "_newlines",
+        "_config",
+        "_cursor",
+        "_hash",
+    )
+
     # Instance variables
     _left: Optional["Rope"]
     _right: Optional["Rope"]
-    _text: str
+    _text: Piece
     _weight: int
     _len: int
+    # Height of the subtree, 0 for leaves
+    _depth: int
+    # Number of newlines in the subtree, None until counted for lazily read leaves
+    _newlines: Optional[int]
+    _config: RopeConfig
+    # (start, stop, text) of the leaf found by the last call to __getitem__
+    _cursor: Optional[Tuple[int, int, Union[str, memoryview]]]
+    # hash(self), computed on first use
+    _hash: Optional[int]
 
     # Static variables
-    _default_leaf_len: int = 10000
+    _default_config: RopeConfig = RopeConfig()
+    # Depth a LAZY rope may reach before it is rebalanced, as in Boehm's cords
+    _lazy_max_depth: int = 48
 
-    def __init__(self, s: Any = "", *, root: "Rope" = None) -> None:
+    def __init__(
+        self,
+        s: Any = "",
+        *,
+        root: Optional["Rope"] = None,
+        config: Optional[RopeConfig] = None,
+    ) -> None:
         """Initialize self.  See type(self).__doc__ for more info."""
+        if config is None:
+            config = root._config if root else Rope._default_config
+        self._config = config
         if not root:
-            if not isinstance(s, str):
+            if isinstance(s, (bytes, bytearray, memoryview)):
+                s = memoryview(s).cast("B")
+            elif not isinstance(s, str):
                 s = str(s)
-            if len(s) <= Rope._default_leaf_len:
+            if len(s) <= config.max_leaf_len:
                 # Left and right subtrees
                 self._left = None
                 self._right = None
-                # Substring stored on the node, always == '' except for leaf nodes
-                self._text = str(s)
+                # Substring stored on the node, always empty except for leaf nodes
+                self._text = s
                 # Weight is the length of the left subtree, or length of the string for leaves
                 self._weight = len(s)
                 self._len = len(s)
+                self._depth = 0
+                self._newlines = s.count("\n") if isinstance(s, str) else None
+                self._cursor = None
             else:  # Break up long strings
-                words = [
-                    "".join(word)
-                    for word in mit.grouper(s, Rope._default_leaf_len, fillvalue="")
-                ]
-                ropes: List["Rope"] = list(map(Rope, words))
-                for i in range(len(words) // 2):
-                    # add strings in pairs to reduce imbalance
-                    ropes = list(it.starmap(op.add, mit.windowed(ropes, 2, step=2)))
-                    if i % 50000 == 0:
-                        ropes = [r._rebalance() for r in ropes]
-                rope = list(ropes)[0]._rebalance()
+                n = config.max_leaf_len
+                rope = type(self)._from_leaves(
+                    (s[k : k + n] for k in range(0, len(s), n)), config
+                )
                 self._left, self._right = rope._left, rope._right
                 self._text = rope._text
                 self._weight = rope._weight
                 self._len = rope._len
+                self._depth = rope._depth
+                self._newlines = rope._newlines
+                self._cursor = None
         else:  # copy
             self._left = root._left
             self._right = root._right
             self._text = root._text
             self._weight = root._weight
             self._len = root._len
+            self._depth = root._depth
+            self._newlines = root._newlines
+            self._cursor = None
+        self._hash = None
+
+    @classmethod
+    def from_chunks(
+        cls, chunks: Iterable[Union[str, Bytes]], config: Optional[RopeConfig] = None
+    ) -> "Rope":
+        """
+        Build a balanced Rope from an iterable of strings, or of bytes-like objects.
+
+        The chunks are regrouped into leaves as they arrive, so the full text is
+        never joined into a single string.
+        """
+        if config is None:
+            config = cls._default_config
+        # The first chunk decides whether an empty result is text or binary
+        chunks = iter(chunks)
+        first = next(chunks, "")
+        texts = cls._leaf_texts(it.chain([first], chunks), config.max_leaf_len)
+        return cls._from_leaves(texts, config, binary=not isinstance(first, str))
+
+    @classmethod
+    def from_file(
+        cls,
+        path: str,
+        encoding: Optional[str] = "utf-8",
+        config: Optional[RopeConfig] = None,
+    ) -> "Rope":
+        """
+        Build a balanced Rope by streaming the file at path one leaf at a time.
+
+        If encoding is None the file is read as a binary rope.
+        """
+        n = (config or cls._default_config).max_leaf_len
+        if encoding is None:
+            with open(path, "rb") as f:
+                texts = cls._leaf_texts(iter(lambda: f.read(n), b""), n)
+                return cls._from_leaves(texts, config, binary=True)
+        with open(path, "r", encoding=encoding, newline="") as f:
+            return cls.from_chunks(iter(lambda: f.read(n), ""), config)
+
+    @classmethod
+    def from_mmap(
+        cls,
+        path: str,
+        encoding: Optional[str] = "latin-1",
+        config: Optional[RopeConfig] = None,
+    ) -> "Rope":
+        """
+        Build a Rope whose leaves are lazily decoded views of a memory-mapped file.
+
+        Building the tree, len(), _cut(), put() and delete() never read the parts
+        of the file they do not touch; edits add ordinary leaves on top of the
+        mapped ones, like a piece table.  encoding must be a single-byte encoding,
+        or None for a binary rope of memoryview leaves over the map.
+        """
+        if encoding is not None and not _is_single_byte(encoding):
+            raise ValueError(f"{encoding} is not a single-byte encoding")
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if not size:
+                return cls(b"" if encoding is None else "", config=config)
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        n = (config or cls._default_config).max_leaf_len
+        if encoding is None:
+            view = memoryview(buf)
+            return cls._from_leaves(
+                (view[k : k + n] for k in range(0, size, n)), config
+            )
+        return cls._from_leaves(
+            (
+                _MappedText(buf, k, min(k + n, size), encoding)
+                for k in range(0, size, n)
+            ),
+            config,
+        )
 
     def __repr__(self) -> str:
         """Return repr(self)."""
@@ -88,13 +400,32 @@ class Rope(Sequence):
 
     def __str__(self) -> str:
         """Return str(self)."""
-        return "".join(self._words())
+        if self._binary:
+            return str(bytes(self))
+        return "".join(self.chunks())  # type: ignore
+
+    def __bytes__(self) -> bytes:
+        """Return bytes(self) for a binary rope."""
+        if not self._binary and self:
+            raise TypeError("can't convert a text Rope to bytes")
+        return b"".join(self.chunks())  # type: ignore
 
     def __eq__(self, other) -> bool:
-        """Return self == other."""
-        if not (isinstance(other, Rope) or isinstance(other, str)):
-            return False
-        return str(self) == str(other)
+        """Return self == other, comparing leaf by leaf without flattening self."""
+        if self is other:
+            return True
+        if isinstance(other, Rope):
+            if self._len != other._len:
+                return False
+            # Like "" and b"", text and binary ropes are never equal
+            if self._binary != other._binary:
+                return False
+            return self._chunks_equal(other.chunks())
+        if isinstance(other, (str, bytes, bytearray, memoryview)):
+            if self._binary != (not isinstance(other, str)) or self._len != len(other):
+                return False
+            return self._chunks_equal([other])
+        return False
 
     def __len__(self) -> int:
         """Return len(self)."""
@@ -104,61 +435,71 @@ class Rope(Sequence):
         """Return bool(self)."""
         return self._len > 0
 
-    def __getitem__(self, i) -> str:
-        """Return self[i]."""
+    @overload
+    def __getitem__(self, i: int) -> Union[str, int]:
+        ...
+
+    @overload
+    def __getitem__(self, i: slice) -> "Rope":
+        ...
+
+    def __getitem__(self, i: Union[int, slice]) -> Union[str, int, "Rope"]:
+        """
+        Return self[i].
+
+        Slices are returned as a Rope which shares structure with self.  The leaf
+        found by the last lookup is cached, so sequential access is amortized O(1).
+        """
         if isinstance(i, slice):
-            return str(self._substring(i.start or 0, i.stop))[:: i.step]
+            start, stop, step = i.indices(self._len)
+            if step == 1:
+                return self._substring(start, stop)
+            items = [self[j] for j in range(start, stop, step)]
+            if self._binary:
+                data: Union[str, bytes] = bytes(cast(List[int], items))
+            else:
+                data = "".join(cast(List[str], items))
+            return type(self)(data, config=self._config)
         if i < 0:
-            i += len(self)
-        if i < 0 or i >= len(self):
-            raise IndexError
-        if i >= self._weight and self._right:
-            return self._right[i - self._weight]
-        if self._left:
-            return self._left[i]
-        return self._text[i]
+            i += self._len
+        if i < 0 or i >= self._len:
+            raise IndexError("Rope index out of range")
+        cursor = self._cursor
+        if cursor is not None and cursor[0] <= i < cursor[1]:
+            return cursor[2][i - cursor[0]]
+        node, offset = self, 0
+        while node._left is not None or node._right is not None:
+            if i - offset >= node._weight and node._right is not None:
+                offset += node._weight
+                node = node._right
+            else:
+                node = node._left  # type: ignore
+        text = _readable(node._text)
+        self._cursor = (offset, offset + node._len, text)
+        return text[i - offset]
 
     def __contains__(self, sub) -> bool:
         """Return sub in self."""
-        if isinstance(sub, Rope):
-            sub = str(sub)
-        return sub in str(self)
+        return self.find(sub) != -1
 
-    def __reversed__(self) -> Iterator[str]:
+    def __reversed__(self) -> Iterator[Union[str, int]]:
         """Return reversed(self)."""
-        if self._right:
-            yield from reversed(self._right)
-        if self._left:
-            yield from reversed(self._left)
-        if self._text:  # self is a leaf node
-            yield from reversed(self._text)
+        chunks = map(_readable, self._chunks(reverse=True))
+        return it.chain.from_iterable(reversed(chunk) for chunk in chunks)
 
-    def __iter__(self) -> Iterator[str]:
-        """Return iter(self).  Same behavior as iter(str)."""
-        if self._left:
-            yield from self._left
-        if self._right:
-            yield from self._right
-        if self._text:  # self is a leaf node
-            yield from self._text
+    def __iter__(self) -> Iterator[Union[str, int]]:
+        """Return iter(self).  Same behavior as iter(str), or iter(bytes)."""
+        return it.chain.from_iterable(self.chunks())
 
     def __add__(self, other: Stringy) -> "Rope":
         """Return self + other."""
-        if isinstance(other, str):
-            other = Rope(other)
-        if not self:
-            return other
-        if not other:
-            return self
-        new_root = Rope()
-        new_root._left = self
-        new_root._right = other
-        new_root._weight = len(self)
-        new_root._len = len(self) + len(other)
-        return new_root
+        if not isinstance(other, Rope):
+            other = type(self)(other, config=self._config)
+        return self._concat(other)._auto_rebalance()
 
     def __radd__(self, other: Stringy) -> "Rope":
-        return self + other
+        """Return other + self."""
+        return type(self)(other, config=self._config) + self
 
     def __iadd__(self, other: Stringy) -> "Rope":
         """Return self + other."""
@@ -168,9 +509,9 @@ class Rope(Sequence):
         """Return self * other."""
         if not isinstance(other, int):
             raise TypeError("can't multiply sequence by non-int of type 'float'")
-        result = Rope()
+        result = self._empty()
         for _ in range(other):
-            result += Rope(root=self)
+            result += type(self)(root=self)
         return result
 
     def __imul__(self, other: int) -> "Rope":
@@ -178,56 +519,423 @@ class Rope(Sequence):
         return self * other
 
     def __hash__(self) -> int:
-        """Return hash(str(self))."""
-        return hash(str(self))
+        """
+        Return hash(str(self)), or hash(bytes(self)) for a binary rope.
 
-    def index(self, sub: str, start: int = 0, end: Optional[int] = None) -> int:
-        """Return str(self).index(sub, start, end)."""
-        return str(self).index(sub, start, end)
+        The hash is cached, so the rope is only flattened the first time.
+        """
+        if self._hash is None:
+            self._hash = hash(self._flat())
+        return self._hash
+
+    def chunks(
+        self, start: int = 0, end: Optional[int] = None
+    ) -> Iterator[Union[str, memoryview]]:
+        """
+        Iterate over the leaf strings of self[start:end] in order.
+
+        Binary ropes yield memoryviews of their leaves.
+        """
+        return map(_readable, self._chunks(start, end))
+
+    def write_to(self, f: Any) -> None:
+        """
+        Write self to the file-like object f with f.writelines() over the leaves.
+
+        Binary leaves are passed as memoryviews, so no bytes are copied.
+        """
+        f.writelines(self.chunks())
+
+    def line_count(self) -> int:
+        """Return the number of lines, one more than the number of newlines."""
+        return self._newline_count() + 1
+
+    def line(self, n: int) -> "Rope":
+        """Return line n of self, without its trailing newline."""
+        count = self.line_count()
+        if n < 0:
+            n += count
+        if n < 0 or n >= count:
+            raise IndexError("Rope line out of range")
+        start = self._line_start(n)
+        end = self._line_start(n + 1) - 1 if n + 1 < count else self._len
+        return self._substring(start, end)
+
+    def offset_to_linecol(self, i: int) -> Tuple[int, int]:
+        """Return the (line, column) of index i, both counted from zero."""
+        if i < 0:
+            i += self._len
+        if i < 0 or i > self._len:
+            raise IndexError("Rope index out of range")
+        line = self._newlines_before(i)
+        return line, i - self._line_start(line)
 
-    def count(self, sub: str, start: int = 0, end: Optional[int] = None) -> int:
-        """Return str(self).index(sub, start, end)."""
-        return str(self).count(sub, start, end)
+    def linecol_to_offset(self, line: int, col: int) -> int:
+        """Return the index of the given (line, column), both counted from zero."""
+        if line < 0 or line >= self.line_count():
+            raise IndexError("Rope line out of range")
+        start = self._line_start(line)
+        if line + 1 < self.line_count():
+            end = self._line_start(line + 1) - 1
+        else:
+            end = self._len
+        if col < 0 or col > end - start:
+            raise IndexError("Rope column out of range")
+        return start + col
+
+    def find(self, sub: Needle, start: int = 0, end: Optional[int] = None) -> int:
+        """Return str(self).find(sub, start, end) without flattening self."""
+        return next(self.finditer(sub, start, end), -1)
+
+    def rfind(self, sub: Needle, start: int = 0, end: Optional[int] = None) -> int:
+        """Return str(self).rfind(sub, start, end) without flattening self."""
+        needle = self._needle(sub)
+        n = len(self)
+        if start > n:
+            return -1
+        start, end, _ = slice(start, end).indices(n)
+        if end < start:
+            return -1
+        if not needle:
+            return end
+        chunks = self._chunks(start, end, reverse=True)
+        if isinstance(needle, str):
+            return _rfind_chunks(map(_text_of, chunks), needle, end)
+        return _rfind_chunks(map(_bytes_of, chunks), needle, end)
+
+    def finditer(
+        self, sub: Needle, start: int = 0, end: Optional[int] = None
+    ) -> Iterator[int]:
+        """
+        Iterate over the indices of non-overlapping matches of sub in self[start:end].
+
+        The leaves are searched in place with str.find (CPython's two-way /
+        Boyer-Moore-Horspool hybrid), and only the last len(sub) - 1 characters of
+        the preceding text are carried over to catch matches that span leaves.
+        """
+        needle = self._needle(sub)
+        n = len(self)
+        if start > n:
+            return
+        start, end, _ = slice(start, end).indices(n)
+        if not needle:
+            yield from range(start, end + 1)
+            return
+        chunks = self._chunks(start, end)
+        if isinstance(needle, str):
+            yield from _find_chunks(map(_text_of, chunks), needle, start)
+        else:
+            yield from _find_chunks(map(_bytes_of, chunks), needle, start)
+
+    def index(self, sub: Needle, start: int = 0, end: Optional[int] = None) -> int:
+        """Return str(self).index(sub, start, end) without flattening self."""
+        result = self.find(sub, start, end)
+        if result == -1:
+            raise ValueError("substring not found")
+        return result
+
+    def rindex(self, sub: Needle, start: int = 0, end: Optional[int] = None) -> int:
+        """Return str(self).rindex(sub, start, end) without flattening self."""
+        result = self.rfind(sub, start, end)
+        if result == -1:
+            raise ValueError("substring not found")
+        return result
+
+    def count(self, sub: Needle, start: int = 0, end: Optional[int] = None) -> int:
+        """Return str(self).count(sub, start, end) without flattening self."""
+        return sum(1 for _ in self.finditer(sub, start, end))
 
     def put(self, i: int, s: Stringy) -> "Rope":
         """Return a copy of self with s inserted at index i."""
-        if type(s) == str:
-            s = Rope(s)
+        if not isinstance(s, Rope):
+            s = type(self)(s, config=self._config)
         # Reduce to concatenation if inserting at either end
         if i == len(self):
-            return self + s
+            return self._concat(s)._auto_rebalance()
         if i == 0:
-            return s + self
+            return s._concat(self)._auto_rebalance()
 
         left, right = self._cut(i)
-        return left + s + right
+        return left._concat(s)._concat(right)._auto_rebalance()
 
     def delete(self, i: int, j: int) -> "Rope":
         """Return copy of self with self[i:j] removed."""
         n = len(self)
         if i == 0 and j > n:
-            return Rope()
+            return self._empty()
         if i == 0:
-            return self._cut(j)[1]
+            return self._cut(j)[1]._auto_rebalance()
         left, mid = self._cut(i)
         if j > len(self):
-            return left
+            return left._auto_rebalance()
         mid, right = self._cut(j)
-        return left + right
+        return left._concat(right)._auto_rebalance()
+
+    @property
+    def _binary(self) -> bool:
+        """Is self a binary rope?"""
+        return isinstance(self._text, memoryview)
+
+    def _flat(self) -> Union[str, bytes]:
+        """Return str(self), or bytes(self) for a binary rope."""
+        return bytes(self) if self._binary else str(self)
+
+    def _empty(self) -> "Rope":
+        """Return an empty Rope of the same kind, text or binary, as self."""
+        return self._leaf(self._text[:0], self._config)
+
+    def _concat(self, other: "Rope") -> "Rope":
+        """
+        Return self + other without checking the rebalancing policy.
+
+        Leaves meeting at the seam are coalesced when their combined length is at
+        most min_leaf_len, reaching through one level of either tree as in the
+        ropes paper, so runs of small edits do not pile up tiny leaves.
+        """
+        if not self:
+            return other
+        if not other:
+            return self
+        if self._binary != other._binary:
+            raise TypeError("can't concat text and binary Ropes")
+        limit = self._config.min_leaf_len
+        if self._len + other._len <= limit:
+            if self._depth == 0 and other._depth == 0:
+                merged = self._merge_leaf(other)
+                if merged is not None:
+                    return merged
+        if other._depth == 0 and self._depth > 0 and self._right is not None:
+            if self._right._depth == 0 and self._right._len + other._len <= limit:
+                merged = self._right._merge_leaf(other)
+                if merged is not None:
+                    return self._left._join(merged)  # type: ignore
+        if self._depth == 0 and other._depth > 0 and other._left is not None:
+            if other._left._depth == 0 and self._len + other._left._len <= limit:
+                merged = self._merge_leaf(other._left)
+                if merged is not None:
+                    return merged._join(other._right)  # type: ignore
+        return self._join(other)
+
+    def _merge_leaf(self, other: "Rope") -> Optional["Rope"]:
+        """Return the leaves self and other merged into one, None for mapped leaves."""
+        if isinstance(self._text, _MappedText) or isinstance(other._text, _MappedText):
+            return None
+        if self._binary:
+            pieces = [self._text, other._text]
+            text: Piece = memoryview(b"".join(pieces))  # type: ignore
+        else:
+            text = self._text + other._text  # type: ignore
+        return self._leaf(text, self._config)
+
+    def _join(self, other: "Rope") -> "Rope":
+        """Return a new node with self and other as its children."""
+        if not self:
+            return other
+        if not other:
+            return self
+        new_root = type(self)(config=self._config)
+        new_root._text = self._text[:0]
+        new_root._left = self
+        new_root._right = other
+        new_root._weight = self._len
+        new_root._len = self._len + other._len
+        new_root._depth = 1 + max(self._depth, other._depth)
+        if self._newlines is not None and other._newlines is not None:
+            new_root._newlines = self._newlines + other._newlines
+        else:
+            new_root._newlines = None
+        return new_root
+
+    def _newline_count(self) -> int:
+        """Return the number of newlines in self, counted and cached on first use."""
+        if self._newlines is None:
+            if self._left is None or self._right is None:  # leaf node
+                text = _flatten(self._text)
+                newline = b"\n" if isinstance(text, bytes) else "\n"
+                self._newlines = text.count(newline)  # type: ignore
+            else:
+                self._newlines = (
+                    self._left._newline_count() + self._right._newline_count()
+                )
+        return self._newlines
+
+    def _newlines_before(self, i: int) -> int:
+        """Return the number of newlines in self[:i]."""
+        count = 0
+        node = self
+        while node._left is not None and node._right is not None:
+            left, right = node._left, node._right
+            if i >= node._weight:
+                count += left._newline_count()
+                i -= node._weight
+                node = right
+            else:
+                node = left
+        text = _flatten(node._text[:i])
+        newline = b"\n" if isinstance(text, bytes) else "\n"
+        return count + text.count(newline)  # type: ignore
+
+    def _line_start(self, n: int) -> int:
+        """Return the index just after the nth newline, or 0 for n == 0."""
+        if n == 0:
+            return 0
+        offset = 0
+        node = self
+        while node._left is not None and node._right is not None:
+            left, right = node._left, node._right
+            left_count = left._newline_count()
+            if n > left_count:
+                n -= left_count
+                offset += node._weight
+                node = right
+            else:
+                node = left
+        text = _flatten(node._text)
+        newline = b"\n" if isinstance(text, bytes) else "\n"
+        i = -1
+        for _ in range(n):
+            i = text.find(newline, i + 1)  # type: ignore
+        return offset + i + 1
+
+    def _chunks_equal(self, others: Iterable[Union[str, Bytes]]) -> bool:
+        """Does the concatenation of others, of the same total length, equal self?"""
+        theirs = iter(others)
+        b: Union[str, Bytes] = _readable(self._text[:0])
+        j = 0
+        for a in self.chunks():
+            i = 0
+            while i < len(a):
+                if j == len(b):
+                    b, j = next(theirs), 0
+                n = min(len(a) - i, len(b) - j)
+                if a[i : i + n] != b[j : j + n]:
+                    return False
+                i += n
+                j += n
+        return True
+
+    def _is_balanced(self) -> bool:
+        """Is len(self) >= F(depth + 2), the balance condition from the ropes paper?"""
+        return self._depth + 2 < len(_FIBS) and self._len >= _FIBS[self._depth + 2]
+
+    def _auto_rebalance(self) -> "Rope":
+        """Return self, rebalanced first if the rebalancing policy calls for it."""
+        policy = self._config.rebalance
+        if policy == NEVER or self._is_balanced():
+            return self
+        if policy == LAZY and self._depth <= Rope._lazy_max_depth:
+            return self
+        return self._rebalance()
+
+    def _needle(self, sub: Needle) -> Union[str, bytes]:
+        """Return the search pattern sub as str or bytes."""
+        if isinstance(sub, int):
+            return bytes([sub])
+        if isinstance(sub, Rope):
+            return sub._flat()
+        if isinstance(sub, (bytearray, memoryview)):
+            return bytes(sub)
+        return sub
+
+    @staticmethod
+    def _leaf_texts(
+        chunks: Iterable[Union[str, Bytes]], leaf_len: int
+    ) -> Iterator[Piece]:
+        """Regroup chunks into pieces of leaf_len items, the last may be shorter."""
+        pending: List[Union[str, memoryview]] = []
+        size = 0
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                text: Union[str, memoryview] = chunk
+            else:
+                text = memoryview(chunk).cast("B")
+            i = 0
+            while i < len(text):
+                piece = text[i : i + leaf_len - size]
+                i += len(piece)
+                pending.append(piece)
+                size += len(piece)
+                if size == leaf_len:
+                    yield _concat(pending)
+                    pending, size = [], 0
+        if pending:
+            yield _concat(pending)
+
+    @classmethod
+    def _leaf(cls, text: Piece, config: Optional[RopeConfig] = None) -> "Rope":
+        """Return a new leaf node holding text, which is stored without copying."""
+        if isinstance(text, (bytes, bytearray)):
+            text = memoryview(text)
+        leaf = cls(config=config)
+        leaf._text = text
+        leaf._weight = len(text)
+        leaf._len = len(text)
+        leaf._newlines = text.count("\n") if isinstance(text, str) else None
+        return leaf
+
+    @classmethod
+    def _from_leaves(
+        cls,
+        texts: Iterable[Piece],
+        config: Optional[RopeConfig] = None,
+        binary: bool = False,
+    ) -> "Rope":
+        """
+        Build a balanced Rope bottom-up from an iterable of leaf strings in one pass.
+
+        Works like a binary counter: a stack holds perfect subtrees of strictly
+        decreasing height, and equal heights are merged as each leaf arrives.
+        If texts is empty the result is an empty binary rope if binary is true.
+        """
+        stack: List[Tuple[int, "Rope"]] = []
+        for text in texts:
+            node, height = cls._leaf(text, config), 0
+            while stack and stack[-1][0] == height:
+                node = stack.pop()[1]._join(node)
+                height += 1
+            stack.append((height, node))
+        result = cls(b"" if binary else "", config=config)
+        while stack:
+            result = stack.pop()[1]._join(result)
+        return result
 
     def _leaves(self) -> Iterator["Rope"]:
         """Iterate over the leaf nodes in order."""
-        if self._left:
-            yield from self._left._leaves()
-        if self._right:
-            yield from self._right._leaves()
-        if self._text:  # self is a leaf node
-            yield self
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if node._left is None or node._right is None:  # leaf node
+                if node._text:
+                    yield node
+            else:
+                stack.append(node._right)
+                stack.append(node._left)
 
-    def _words(self) -> Iterator[str]:
-        """Iterate over the leaf nodes' _text field in order."""
-        for leaf in self._leaves():
-            yield leaf._text
+    def _chunks(
+        self, start: int = 0, end: Optional[int] = None, reverse: bool = False
+    ) -> Iterator[Piece]:
+        """
+        Iterate over the leaf texts clipped to self[start:end].
+
+        Subtrees outside of [start, end) are skipped without being visited.
+        """
+        if end is None:
+            end = len(self)
+        stack = [(self, 0)]
+        while stack:
+            node, offset = stack.pop()
+            if offset >= end or offset + node._len <= start:
+                continue
+            if node._left is None and node._right is None:
+                if node._text:
+                    yield node._text[max(start - offset, 0) : end - offset]
+                continue
+            children = [(node._left, offset), (node._right, offset + node._weight)]
+            if reverse:
+                children.reverse()
+            for child, child_offset in reversed(children):
+                if child is not None:
+                    stack.append((child, child_offset))
 
     def _nodes(self) -> Iterator["Rope"]:
         """Iterate over all nodes in the tree in depth-first, left to right order."""
@@ -237,14 +945,9 @@ class Rope(Sequence):
         if self._right:
             yield from self._right._nodes()
 
-    def _max_depth(self, depth=0) -> int:
-        if self._text:
-            return depth + 1
-        if self._left:
-            left_depth = self._left._max_depth(depth + 1)
-        if self._right:
-            right_depth = self._right._max_depth(depth + 1)
-        return max((left_depth, right_depth))
+    def _max_depth(self) -> int:
+        """Return the number of levels in the tree, counting the leaves."""
+        return self._depth + 1
 
     def _cut(self, i: int) -> Tuple["Rope", "Rope"]:
         """
@@ -253,92 +956,61 @@ class Rope(Sequence):
         Needed for _substring and related operations.
         Rope equivalent of (string[:i], string[i:]).
         """
-        if i == 0:
-            return Rope(), self
-        if i == len(self):
-            return self, Rope()
-        left_cut = Rope(root=self)
-        right_cut = Rope()
-
-        if i >= self._weight and self._right:
-            if i == self._weight:
-                right_cut = self._right
-                left_cut._right = None
-                left_cut._len = len(left_cut._left)
-                return left_cut, right_cut
-            left_cut._right, right_cut = self._right._cut(i - self._weight)
-            left_cut._weight = len(left_cut._left)
-            left_cut._len = len(left_cut._left) + len(left_cut._right)
-            return left_cut, right_cut
-
-        if self._left:
-            left_cut._left, right_cut = self._left._cut(i)
-            left_cut._right = None
-            left_cut._weight = len(left_cut._left)
-            left_cut._len = len(left_cut._left)
-            if self._right:
-                right_cut += self._right
-            return left_cut, right_cut
-
-        left_cut, right_cut = Rope(self._text[:i]), Rope(self._text[i:])
-        return left_cut, right_cut
+        if i <= 0:
+            return self._empty(), self
+        if i >= self._len:
+            return self, self._empty()
+        if self._left is None or self._right is None:  # leaf node
+            return (
+                self._leaf(self._text[:i], self._config),
+                self._leaf(self._text[i:], self._config),
+            )
+        if i < self._weight:
+            left, mid = self._left._cut(i)
+            return left, mid._concat(self._right)
+        if i > self._weight:
+            mid, right = self._right._cut(i - self._weight)
+            return self._left._concat(mid), right
+        return self._left, self._right
 
     def _substring(self, i: int, j: int) -> "Rope":
-        """Implement the substring operation using the _cut() method."""
-        n = len(self)
-        if not j:
-            j = n
-        if i == 0 and j > n:
-            return Rope(root=self)
+        """
+        Implement the substring operation using the _cut() method.
+
+        Rope equivalent of string[i:j] for 0 <= i, j <= len(self).
+        """
+        if i >= j:
+            return self._empty()
+        if i == 0 and j == len(self):
+            return self
         if i == 0:
             return self._cut(j)[0]
-        if j > n:
+        if j == len(self):
             return self._cut(i)[1]
-        left_res = self._cut(j)[0]
-        return left_res._cut(i)[1]
+        return self._cut(j)[0]._cut(i)[1]
 
     def _rebalance(self) -> "Rope":
         """
         Return a balanced version of self.
 
         See paper 'Ropes: an alternative to strings' for algorithm description.
+        Slot k holds a rope with length below F(k + 3); the occupied slots, read
+        from the highest down, hold consecutive pieces of self from left to right.
         """
-
-        def fib(n) -> int:
-            """Return the nth fibonacci number."""
-            return ((1 + sqrt(5)) ** n - (1 - sqrt(5)) ** n) / (2 ** n * sqrt(5))
-
-        def fibs() -> Iterator[int]:
-            """Iterate through the fibonacci sequence."""
-            n = 0
-            while True:
-                yield int(fib(n))
-                n += 1
-
-        def balance_slot(n):
-            fibs_it = it.takewhile(lambda x: x <= n, fibs())
-            return deque(fibs_it, maxlen=1).pop()
-
-        slots: Dict[int, "Rope"] = dict()
+        slots: List[Optional["Rope"]] = []
         for leaf in self._leaves():
-            ln = len(leaf)
-            prev = Rope()
-            slot = 1
-            for slot in it.takewhile(lambda x: x <= ln, fibs()):
-                if slot in slots:
-                    prev = slots.pop(slot) + prev
-            if prev:
-                prev += leaf
-                slot = balance_slot(len(prev))
-                while slot in slots:
-                    prev = slots.pop(balance_slot(len(prev))) + prev
-                    slot = balance_slot(len(prev))
-                slots[slot] = prev
-            else:
-                slots[slot] = leaf
-        result = Rope()
-        for slot in sorted(slots):
-            result = slots.pop(slot) + result
+            node, k = leaf, 0
+            while node._len >= _FIBS[k + 3] or (k < len(slots) and slots[k]):
+                if k < len(slots) and slots[k]:
+                    node = slots[k]._join(node)  # type: ignore
+                    slots[k] = None
+                k += 1
+            slots.extend([None] * (k + 1 - len(slots)))
+            slots[k] = node
+        result = self._empty()
+        for slot in slots:
+            if slot is not None:
+                result = slot._join(result)
         return result
 
 
@@ -350,7 +1022,7 @@ if __name__ == "__main__":
     # Test Rope performance against str.
     import string
     import random
-    from timer import Timer
+    from timer import Timer  # type: ignore
 
     def random_string(length: int) -> str:
         """Return random string of specified length."""
@@ -383,3 +1055,31 @@ if __name__ == "__main__":
                 new_string = new_string[: N // 2] + new_string[N // 2 + 10 :]
 
         print("----------------------")
+
+    # Test memory use and edit latency as the leaf size varies.
+    import tracemalloc
+
+    N = 10 ** 6
+    long_string = random_string(N)
+    for leaf_len in [4 ** n for n in range(2, 9)]:
+        print(f"max_leaf_len = {leaf_len}")
+        config = RopeConfig(min_leaf_len=leaf_len // 2, max_leaf_len=leaf_len)
+        tracemalloc.start()
+        long_rope = Rope(long_string, config=config)
+        with Timer(name=f"1000 single character inserts, leaf length {leaf_len}"):
+            for _ in range(1000):
+                long_rope = long_rope.put(random.randrange(len(long_rope)), "x")
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"Memory: {size / len(long_rope):.2f} bytes per character")
+        print("----------------------")
+
+    # Compare memory per node with and without __slots__.
+    from pyutils import allocated_bytes, without_slots  # type: ignore
+
+    config = RopeConfig(min_leaf_len=0, max_leaf_len=16)
+    long_string = random_string(10 ** 6)
+    n_nodes = sum(1 for _ in Rope(long_string, config=config)._nodes())
+    for label, cls in [("without", without_slots(Rope)), ("with", Rope)]:
+        size = allocated_bytes(lambda: cls(long_string, config=config))
+        print(f"Rope {label} __slots__: {size / n_nodes:.1f} bytes per node")
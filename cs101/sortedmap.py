@@ -0,0 +1,397 @@
+"""sortedmap.py: Implements a sorted map stored as a list of short sorted lists."""
+# Standard Library
+from bisect import bisect_left, bisect_right
+from itertools import accumulate, chain
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+# Third party libraries
+
+# Local imports
+from cs101.bstmap import K, SortedMapMixin
+
+
+class SortedMap(SortedMapMixin[K]):
+    """
+    A sorted map with the same interface as BSTMap.
+
+    The keys are kept in sorted order in a list of short sorted lists, like the
+    leaves of a B+ tree, with a parallel list of lists for the values.  A key is
+    found with one bisect over the largest key of each list and one bisect inside
+    a list, so reads touch a few contiguous arrays instead of chasing a pointer
+    per level, and inserts and deletes only shift part of one short list.
+    """
+
+    __slots__ = (
+        "sort_key",
+        "_keys",
+        "_values",
+        "_orders",
+        "_maxes",
+        "_offsets",
+        "_len",
+    )
+
+    # Lists are split when they grow past twice this length, and merged with a
+    # neighbour when they shrink below half of it.
+    _load = 1000
+
+    def __init__(
+        self,
+        iterable: Optional[Iterable[Tuple[K, Any]]] = None,
+        key: Optional[Callable[[K], Any]] = None,
+    ) -> None:
+        """Initialize a new map, ordered by the key function if one is given."""
+        self._keys: List[List[K]] = []
+        self._values: List[List[Any]] = []
+        # What each key is sorted by; the same lists as _keys for natural order
+        self._orders: List[List[Any]] = self._keys if key is None else []
+        # The last (largest) entry of each list in _orders
+        self._maxes: List[Any] = []
+        # Number of keys before each list, rebuilt on demand after an edit
+        self._offsets: Optional[List[int]] = None
+        self._len = 0
+        super().__init__(iterable, key)
+
+    def __getitem__(self, key: K) -> Any:
+        """Return self[key]."""
+        i, j = self._find(key)
+        return self._values[i][j]
+
+    def __contains__(self, key) -> bool:
+        """Return key in self."""
+        try:
+            self._find(key)
+        except KeyError:
+            return False
+        return True
+
+    def __setitem__(self, key: K, value: Any) -> None:
+        """Set self[key] = value"""
+        k = key if self.sort_key is None else self.sort_key(key)
+        maxes = self._maxes
+        if not maxes:
+            self._keys.append([key])
+            self._values.append([value])
+            if self.sort_key is not None:
+                self._orders.append([k])
+            maxes.append(k)
+            self._offsets = None
+            self._len = 1
+            return
+        i = bisect_left(maxes, k)
+        if i == len(maxes):  # key goes after everything, at the end of the last list
+            i -= 1
+        orders = self._orders[i]
+        j = bisect_left(orders, k)
+        if j < len(orders) and not k < orders[j]:
+            self._values[i][j] = value
+            return
+        self._keys[i].insert(j, key)
+        self._values[i].insert(j, value)
+        if self.sort_key is not None:
+            orders.insert(j, k)
+        maxes[i] = orders[-1]
+        self._offsets = None
+        self._len += 1
+        if len(orders) > 2 * self._load:
+            self._split(i)
+
+    def __delitem__(self, key: K) -> None:
+        """del self[key]."""
+        i, j = self._find(key)
+        self._delete(i, j)
+
+    def __iter__(self) -> Iterator[K]:
+        """Return iter(self)."""
+        return chain.from_iterable(self._keys)
+
+    def __len__(self) -> int:
+        """Return len(self)."""
+        return self._len
+
+    def __str__(self) -> str:
+        """Return str(self)."""
+        return "{" + ", ".join(f"{k!r}: {v!r}" for k, v in self.items()) + "}"
+
+    def __repr__(self) -> str:
+        """Return repr(self)."""
+        return f"{type(self).__name__}({str(self)})"
+
+    def keys(self) -> Iterator[K]:  # type: ignore
+        """Return an iterator over the keys."""
+        return iter(self)
+
+    def values(self) -> Iterator[Any]:  # type: ignore
+        """Return an iterator over the values."""
+        return chain.from_iterable(self._values)
+
+    def items(self) -> Iterator[Tuple[K, Any]]:  # type: ignore
+        """Return an iterator over key, value tuples."""
+        return zip(self.keys(), self.values())
+
+    def irange(
+        self,
+        minimum: Optional[K] = None,
+        maximum: Optional[K] = None,
+        inclusive: Tuple[bool, bool] = (True, True),
+        reverse: bool = False,
+    ) -> Iterator[K]:
+        """
+        Return an iterator over the keys from minimum to maximum in O(log n + k).
+
+        A bound of None leaves that end of the range open, and inclusive says
+        whether keys equal to minimum and maximum are included.
+        """
+        if minimum is None:
+            i, j = 0, 0
+        else:
+            i, j = self._bisect(minimum, right=not inclusive[0])
+        if maximum is None:
+            stop_i, stop_j = len(self._keys), 0
+        else:
+            stop_i, stop_j = self._bisect(maximum, right=inclusive[1])
+        if (stop_i, stop_j) <= (i, j):
+            return iter(())
+        # Slices of each list in the range, from list i to list stop_i
+        parts = []
+        for n in range(i, min(stop_i + 1, len(self._keys))):
+            start = j if n == i else 0
+            stop = stop_j if n == stop_i else len(self._keys[n])
+            parts.append(self._keys[n][start:stop])
+        if reverse:
+            return chain.from_iterable(map(reversed, reversed(parts)))
+        return chain.from_iterable(parts)
+
+    def floor(self, key: K) -> K:
+        """Return the greatest key <= key, raising KeyError if there is none."""
+        i, j = self._bisect(key, right=True)
+        if j > 0:
+            return self._keys[i][j - 1]
+        if i > 0:
+            return self._keys[i - 1][-1]
+        raise KeyError(f"{key}")
+
+    def ceiling(self, key: K) -> K:
+        """Return the least key >= key, raising KeyError if there is none."""
+        i, j = self._bisect(key, right=False)
+        if i == len(self._keys):
+            raise KeyError(f"{key}")
+        return self._keys[i][j]
+
+    def bisect(self, key: K) -> int:
+        """Return the number of keys <= key, the index key would be inserted at."""
+        i, j = self._bisect(key, right=True)
+        return self._offsets_list()[i] + j
+
+    def rank(self, key: K) -> int:
+        """Return the number of keys < key."""
+        i, j = self._bisect(key, right=False)
+        return self._offsets_list()[i] + j
+
+    def index(self, key: K) -> int:
+        """Return the position of key in sorted order, raising ValueError if absent."""
+        if key not in self:
+            raise ValueError(f"{key} is not in map")
+        return self.rank(key)
+
+    def select(self, i: int) -> Tuple[K, Any]:
+        """Return the (key, value) pair with the i-th smallest key."""
+        if i < 0:
+            i += self._len
+        if not 0 <= i < self._len:
+            raise IndexError("map index out of range")
+        offsets = self._offsets_list()
+        n = bisect_right(offsets, i) - 1
+        j = i - offsets[n]
+        return self._keys[n][j], self._values[n][j]
+
+    def min(self) -> K:
+        """Return the smallest key, raising KeyError if the map is empty."""
+        if not self._keys:
+            raise KeyError("map is empty")
+        return self._keys[0][0]
+
+    def max(self) -> K:
+        """Return the largest key, raising KeyError if the map is empty."""
+        if not self._keys:
+            raise KeyError("map is empty")
+        return self._keys[-1][-1]
+
+    def popitem(self, last: bool = True) -> Tuple[K, Any]:
+        """Remove and return the (key, value) pair with the largest key, or smallest."""
+        if not self._keys:
+            raise KeyError("map is empty")
+        i = len(self._keys) - 1 if last else 0
+        j = len(self._keys[i]) - 1 if last else 0
+        item = self._keys[i][j], self._values[i][j]
+        self._delete(i, j)
+        return item
+
+    def _isSorted(self) -> bool:
+        """Are the keys in order, and are the lists, lengths and maxes consistent?"""
+        orders = list(chain.from_iterable(self._orders))
+        if any(not a < b for a, b in zip(orders, orders[1:])):
+            return False
+        if self.sort_key is not None:
+            if orders != [self.sort_key(k) for k in self]:
+                return False
+        if len(orders) != self._len or not all(self._keys):
+            return False
+        if list(map(len, self._keys)) != list(map(len, self._values)):
+            return False
+        if len(self._keys) > 1 and min(map(len, self._keys)) < self._load // 2:
+            return False
+        return self._maxes == [orders[-1] for orders in self._orders]
+
+    def _find(self, key: K) -> Tuple[int, int]:
+        """Return the list index and position of key, raising KeyError if absent."""
+        k = key if self.sort_key is None else self.sort_key(key)
+        i = bisect_left(self._maxes, k)
+        if i < len(self._maxes):
+            orders = self._orders[i]
+            j = bisect_left(orders, k)
+            if not k < orders[j]:
+                return i, j
+        raise KeyError(f"{key}")
+
+    def _bisect(self, key: K, right: bool) -> Tuple[int, int]:
+        """
+        Return the list index and position where key would be inserted.
+
+        Keys equal to key come before that position if right, and after it if not.
+        A position past every key is returned as (len(self._keys), 0).
+        """
+        k = self._order(key)
+        bisect = bisect_right if right else bisect_left
+        i = bisect(self._maxes, k)
+        if i == len(self._maxes):
+            return i, 0
+        return i, bisect(self._orders[i], k)
+
+    def _offsets_list(self) -> List[int]:
+        """Return the number of keys before each list."""
+        if self._offsets is None:
+            self._offsets = list(accumulate(map(len, self._keys), initial=0))
+        return self._offsets
+
+    def _delete(self, i: int, j: int) -> None:
+        """Delete the item at position j of list i, merging lists that get short."""
+        del self._keys[i][j]
+        del self._values[i][j]
+        if self.sort_key is not None:
+            del self._orders[i][j]
+        self._offsets = None
+        self._len -= 1
+        if len(self._keys[i]) >= self._load // 2:
+            self._maxes[i] = self._orders[i][-1]
+        elif len(self._keys) > 1:
+            # Merge with a neighbour, then split again if that made it too long
+            if i == 0:
+                i = 1
+            for lists in self._list_groups():
+                lists[i - 1].extend(lists[i])
+                del lists[i]
+            del self._maxes[i]
+            self._maxes[i - 1] = self._orders[i - 1][-1]
+            if len(self._keys[i - 1]) > 2 * self._load:
+                self._split(i - 1)
+        elif self._keys[i]:
+            self._maxes[i] = self._orders[i][-1]
+        else:
+            for lists in self._list_groups():
+                lists.clear()
+            self._maxes.clear()
+
+    def _split(self, i: int) -> None:
+        """Split list i in half."""
+        half = len(self._keys[i]) // 2
+        for lists in self._list_groups():
+            lists.insert(i + 1, lists[i][half:])
+            del lists[i][half:]
+        self._maxes.insert(i, self._orders[i][-1])
+        self._offsets = None
+
+    def _list_groups(self) -> List[List[List[Any]]]:
+        """Return the lists of lists that are edited in step, counting each once."""
+        if self.sort_key is None:
+            return [self._keys, self._values]
+        return [self._keys, self._values, self._orders]
+
+    def _prefers_inserts(self, n: int) -> bool:
+        """Is inserting n new items one at a time cheaper than a rebuild?"""
+        return n * 4 < self._len
+
+    def _rebuild(self, items: List[Tuple[K, Any]]) -> None:
+        """Replace the contents of self with sorted, distinct items in O(n)."""
+        keys = [k for k, _ in items]
+        values = [v for _, v in items]
+        n = len(items)
+        # Spread the items evenly so that every list holds between load / 2 and load
+        m = -(-n // self._load)
+        bounds = [n * i // m for i in range(m + 1)] if n else [0]
+        self._keys[:] = [keys[a:b] for a, b in zip(bounds, bounds[1:])]
+        self._values[:] = [values[a:b] for a, b in zip(bounds, bounds[1:])]
+        if self.sort_key is not None:
+            self._orders[:] = [list(map(self.sort_key, k)) for k in self._keys]
+        self._maxes[:] = [orders[-1] for orders in self._orders]
+        self._offsets = None
+        self._len = n
+
+
+if __name__ == "__main__":
+
+    # Compare SortedMap with BSTMap on insert, lookup, delete and range scans.
+    # Run this from the repository root with `python -m cs101.sortedmap`.
+    import random
+    import sys
+
+    from cs101.bstmap import BSTMap
+    from cs101.timer import Timer
+
+    def timed(fn: Callable[[], Any]) -> float:
+        timer = Timer(logger=None)
+        timer.start()
+        fn()
+        return timer.stop()
+
+    # Pass a larger power of ten, e.g. 7, to go up to 10M keys.
+    max_exp = int(sys.argv[1]) if len(sys.argv) > 1 else 6
+    columns = ["insert", "lookup", "delete", "scan"]
+    print(f"{'keys':>9} {'map':>9} " + " ".join(f"{c:>8}" for c in columns))
+    for exp in range(3, max_exp + 1):
+        n = 10 ** exp
+        keys = random.sample(range(10 * n), n)
+        probes = random.sample(keys, min(n, 10 ** 5))
+        bounds = [sorted(random.sample(range(10 * n), 2)) for _ in range(100)]
+        for cls in (BSTMap, SortedMap):
+            smap: Union[BSTMap[int], SortedMap[int]] = cls()
+
+            def insert() -> None:
+                for k in keys:
+                    smap[k] = k
+
+            def lookup() -> None:
+                for k in probes:
+                    smap[k]
+
+            def scan() -> None:
+                for lo, hi in bounds:
+                    for _ in smap.irange(lo, lo + (hi - lo) // 100):
+                        pass
+
+            def delete() -> None:
+                for k in probes:
+                    del smap[k]
+
+            times = [timed(insert), timed(lookup), timed(delete), timed(scan)]
+            cells = " ".join(f"{t:8.3f}" for t in times)
+            print(f"{n:>9} {cls.__name__:>9} {cells}")
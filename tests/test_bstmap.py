@@ -1,12 +1,15 @@
 """test_bstmap.py: tests for binary search tree module."""
 # standard library
+import math
 import random
+import sys
+import threading
 
 # third party libraries
 import pytest
 
 # local libraries
-from cs101.bstmap import BSTMap
+from cs101.bstmap import BSTMap, ConcurrentBSTMap, PersistentBSTMap
 
 
 def test_build():
@@ -31,6 +34,7 @@ def test_del():
     for k, v in set(init):
         del tree[k]
         assert tree._isBST()
+        assert tree._isBalanced()
         assert k not in tree
 
 
@@ -57,7 +61,389 @@ def test_nodes_iter():
             assert next(node.right._nodes()).key == node.key + 1
 
 
+def test_balance():
+    """Test that sorted inserts and deletes keep the tree balanced."""
+    n = 5000
+    tree = BSTMap((k, str(k)) for k in range(n))
+    assert tree._isBST()
+    assert tree._isBalanced()
+    assert tree.height <= 1.45 * math.log2(n + 2)
+    assert list(tree) == list(range(n))
+    for k in range(0, n, 3):
+        del tree[k]
+        assert k not in tree
+    assert tree._isBST()
+    assert tree._isBalanced()
+    for node in tree._nodes():
+        for child in (node.left, node.right):
+            assert child is None or child.parent is node
+    assert list(tree.items()) == [(k, str(k)) for k in range(n) if k % 3]
+    for k in reversed(range(n)):
+        tree[k] = k
+    assert tree._isBalanced()
+    assert all(tree[k] == k for k in range(n))
+    assert len(BSTMap([])) == 0
+
+
+def test_order():
+    """Test that keys are ordered by value, or by the key function."""
+    keys = random.sample(range(-1000, 1000), 500) + [-1, -2]  # hash(-1) == hash(-2)
+    tree = BSTMap((k, str(k)) for k in keys)
+    assert tree._isBST()
+    assert list(tree) == sorted(set(keys))
+    assert tree[-1] == "-1" and tree[-2] == "-2"
+    words = ["pear", "Apple", "fig", "banana", "Cherry"]
+    tree = BSTMap(((w, len(w)) for w in words), key=str.lower)
+    assert list(tree) == sorted(words, key=str.lower)
+    assert "APPLE" in tree and tree["FIG"] == 3
+    del tree["PEAR"]
+    assert list(tree) == ["Apple", "banana", "Cherry", "fig"]
+    tree = BSTMap(((k, k) for k in range(100)), key=lambda k: -k)
+    assert list(tree) == list(reversed(range(100)))
+    assert tree._isBST()
+
+
+def test_node_comparison():
+    """Test comparing nodes with nodes, keys and values that are not keys."""
+    tree = BSTMap([(1, "a"), (2, "b")])
+    assert tree == tree.key and tree == BSTMap([(tree.key, None)])
+    first, last = tree._end(last=False), tree._end(last=True)
+    assert first < last and first <= 1 < last and not last < first
+    for other in ({}, None, "x", [1]):
+        assert not tree == other and tree != other
+    assert tree not in [None] and BSTMap() != BSTMap()
+    empty = BSTMap()
+    assert empty == empty and empty != 1 and not empty == None  # noqa: E711
+    with pytest.raises(TypeError):
+        tree < "x"
+    with pytest.raises(TypeError):
+        empty < tree
+    words = BSTMap([("a", 1)], key=str.lower)
+    assert words == "A" and words != 1
+
+
+def test_range_queries():
+    """Test irange, floor, ceiling, bisect, min, max and popitem."""
+    keys = sorted(random.sample(range(0, 10000, 2), 1000))
+    tree = BSTMap((k, -k) for k in keys)
+    for _ in range(100):
+        lo, hi = sorted(random.sample(range(-10, 10010), 2))
+        expected = [k for k in keys if lo <= k <= hi]
+        assert list(tree.irange(lo, hi)) == expected
+        assert list(tree.irange(lo, hi, reverse=True)) == expected[::-1]
+        assert list(tree.irange(lo, hi, (False, False))) == [
+            k for k in keys if lo < k < hi
+        ]
+        assert list(tree.irange(minimum=lo)) == [k for k in keys if k >= lo]
+        assert list(tree.irange(maximum=hi)) == [k for k in keys if k <= hi]
+        assert tree.bisect(hi) == len([k for k in keys if k <= hi])
+        below = [k for k in keys if k <= lo]
+        above = [k for k in keys if k >= lo]
+        if below:
+            assert tree.floor(lo) == below[-1]
+        else:
+            with pytest.raises(KeyError):
+                tree.floor(lo)
+        if above:
+            assert tree.ceiling(lo) == above[0]
+        else:
+            with pytest.raises(KeyError):
+                tree.ceiling(lo)
+    assert list(tree.irange()) == keys
+    assert tree.min() == keys[0] and tree.max() == keys[-1]
+    assert tree.popitem() == (keys[-1], -keys[-1])
+    assert tree.popitem(last=False) == (keys[0], -keys[0])
+    assert list(tree) == keys[1:-1]
+    assert tree._isBalanced()
+    empty = BSTMap()
+    assert list(empty.irange(0, 10)) == []
+    for method in (empty.min, empty.max, empty.popitem):
+        with pytest.raises(KeyError):
+            method()
+
+
+def test_order_statistics():
+    """Test len, rank, index, select and bisect against a sorted list."""
+    tree = BSTMap()
+    keys: list = []
+    assert len(tree) == 0
+    for k in random.sample(range(2000), 1000):
+        tree[k] = str(k)
+        keys.append(k)
+    keys.sort()
+    for k in keys[::7]:
+        del tree[k]
+    del keys[::7]
+    assert len(tree) == len(keys)
+    assert tree._isBalanced()
+    for i, k in enumerate(keys):
+        assert tree.select(i) == (k, str(k))
+        assert tree.index(k) == i
+        assert tree.rank(k) == i
+        assert tree.rank(k + 0.5) == tree.bisect(k) == i + 1
+    assert tree.select(-1) == (keys[-1], str(keys[-1]))
+    assert tree.rank(-1) == tree.bisect(-1) == 0
+    with pytest.raises(IndexError):
+        tree.select(len(keys))
+    with pytest.raises(ValueError):
+        tree.index(-1)
+    assert str(BSTMap([(2, "b"), (1, "a")])) == "{1: 'a', 2: 'b'}"
+
+
+def test_bulk():
+    """Test from_sorted, update and merge."""
+    tree = BSTMap.from_sorted([(k, k) for k in range(1000)] + [(999, "last")])
+    assert tree._isBST()
+    assert tree._isBalanced()
+    assert list(tree.items()) == [(k, k) for k in range(999)] + [(999, "last")]
+    with pytest.raises(ValueError):
+        BSTMap.from_sorted([(2, 2), (1, 1)])
+    tree = BSTMap.from_sorted([("a", 1), ("B", 2)], key=str.lower)
+    assert list(tree) == ["a", "B"]
+    tree.update({"A": 3}, c=4)
+    assert list(tree.items()) == [("a", 3), ("B", 2), ("c", 4)]
+    assert len(BSTMap.from_sorted([])) == 0
+
+    evens = BSTMap((k, "even") for k in range(0, 1000, 2))
+    odds = BSTMap((k, "odd") for k in range(1, 1000, 2))
+    merged = evens.merge(odds)
+    assert list(merged) == list(range(1000))
+    assert len(evens) == len(odds) == 500
+    assert merged._isBalanced()
+
+    class MyMap(BSTMap):
+        pass
+
+    assert type(MyMap(evens.items()).merge(odds)) is MyMap
+    # Few new items are inserted one by one, many are merged and rebuilt
+    for n in (3, 3000):
+        tree = BSTMap((k, k) for k in range(1000))
+        new = {k: -k for k in random.sample(range(-2000, 2000), n)}
+        tree.update(new)
+        expected = {k: k for k in range(1000)}
+        expected.update(new)
+        assert dict(tree.items()) == expected
+        assert len(tree) == len(expected)
+        assert tree._isBalanced()
+        assert all(tree[k] == v for k, v in expected.items())
+
+
+def test_traversal():
+    """Test iterating forwards and backwards over the tree and its subtrees."""
+    keys = random.sample(range(100000), 20000)
+    tree = BSTMap((k, -k) for k in keys)
+    keys.sort()
+    assert list(tree) == keys
+    assert list(reversed(tree)) == keys[::-1]
+    assert list(tree.values()) == [-k for k in keys]
+    assert list(tree.items()) == [(k, -k) for k in keys]
+    for node in random.sample(list(tree._nodes()), 100):
+        sub = [n.key for n in node._nodes()]
+        assert sub == sorted(sub) and len(sub) == len(node)
+        assert [n.key for n in node._nodes(reverse=True)] == sub[::-1]
+    empty = BSTMap()
+    assert list(empty) == list(empty.values()) == list(reversed(empty)) == []
+
+
+def test_cursor():
+    """Test moving a cursor forwards and backwards through the map."""
+    keys = list(range(0, 200, 2))
+    tree = BSTMap((k, str(k)) for k in keys)
+    cursor = tree.cursor()
+    with pytest.raises(StopIteration):
+        cursor.prev()
+    assert [k for k, _ in cursor] == keys
+    with pytest.raises(StopIteration):
+        cursor.next()
+    assert cursor.prev() == (198, "198")
+    assert cursor.next() == (198, "198")
+    cursor.seek(51)
+    assert cursor.next() == (52, "52")
+    assert cursor.prev() == (52, "52")
+    assert cursor.prev() == (50, "50")
+    cursor.seek(50)
+    assert cursor.next() == (50, "50")
+    cursor.seek(1000)
+    assert cursor.prev() == (198, "198")
+    # Resumable pages of ten items
+    cursor.seek(-1)
+    pages = []
+    while True:
+        page = [item for _, item in zip(range(10), cursor)]
+        if not page:
+            break
+        pages.append(page)
+        del tree[page[0][0]]
+        cursor.seek(page[-1][0])
+        cursor.next()
+    assert [k for page in pages for k, _ in page] == keys
+    assert len(tree) == len(keys) - len(pages)
+    empty = BSTMap().cursor()
+    for move in (empty.next, empty.prev):
+        with pytest.raises(StopIteration):
+            move()
+
+
+def test_persistent():
+    """Test that PersistentBSTMap snapshots keep their contents and share nodes."""
+    tree = PersistentBSTMap()
+    expected: dict = {}
+    snapshots = []
+    for i in range(3000):
+        k = random.randrange(1000)
+        if k in expected and random.random() < 0.4:
+            del tree[k]
+            del expected[k]
+        else:
+            tree[k] = expected[k] = i
+        if i % 300 == 0:
+            snapshots.append((tree.snapshot(), sorted(expected.items())))
+    assert tree._isBalanced()
+    assert list(tree.items()) == sorted(expected.items())
+    assert len(tree) == len(expected)
+    for snap, items in snapshots:
+        assert list(snap.items()) == items
+        assert snap._isBalanced()
+    with pytest.raises(KeyError):
+        del tree[-1]
+
+    # An update copies only the path to the key it changes
+    def nodes(root):
+        stack, found = [root], set()
+        while stack:
+            node = stack.pop()
+            if node is not None:
+                found.add(id(node))
+                stack.extend((node.left, node.right))
+        return found
+
+    snap = tree.snapshot()
+    tree[min(expected)] = "new"
+    assert len(nodes(tree._root) - nodes(snap._root)) <= tree._root.height + 1
+    assert snap[min(expected)] == expected[min(expected)]
+
+    # Iteration walks the tree as it was when it started
+    it = iter(tree)
+    first = next(it)
+    for k in list(expected):
+        del tree[k]
+    assert [first, *it] == sorted(expected)
+    assert len(tree) == 0
+    ordered = PersistentBSTMap(((k, k) for k in range(100)), key=lambda k: -k)
+    assert list(ordered.irange(60, 50)) == list(range(60, 49, -1))
+    assert ordered.min() == 99 and ordered.max() == 0
+
+
+def test_persistent_queries():
+    """Test the queries and bulk updates of PersistentBSTMap against BSTMap."""
+    keys = random.sample(range(0, 4000, 2), 1000)
+    expected = BSTMap((k, -k) for k in keys)
+    for cls in (PersistentBSTMap, ConcurrentBSTMap):
+        tree = cls((k, -k) for k in keys)
+        assert tree._isBalanced() and type(tree.snapshot()) is cls
+        for k in random.sample(range(-10, 4010), 200):
+            assert tree.bisect(k) == expected.bisect(k)
+            assert tree.rank(k) == expected.rank(k)
+            for method in ("floor", "ceiling", "index"):
+                try:
+                    result = getattr(expected, method)(k)
+                except (KeyError, ValueError) as error:
+                    with pytest.raises(type(error)):
+                        getattr(tree, method)(k)
+                else:
+                    assert getattr(tree, method)(k) == result
+        for i in range(-len(keys), len(keys)):
+            assert tree.select(i) == expected.select(i)
+        with pytest.raises(IndexError):
+            tree.select(len(keys))
+        # A cursor walks a snapshot, whatever happens to the map meanwhile
+        k = expected.select(500)[0]
+        cursor = tree.cursor()
+        cursor.seek(k + 1)
+        tree.clear()
+        assert cursor.prev() == cursor.next() == (k, -k)
+        assert [key for key, _ in cursor] == list(expected.irange(k + 1))
+        with pytest.raises(StopIteration):
+            cursor.next()
+        tree = cls.from_sorted(expected.items())
+        assert type(tree) is cls and tree._isBalanced()
+        assert tree.popitem() == (expected.max(), -expected.max())
+        assert tree.popitem(last=False) == (expected.min(), -expected.min())
+        merged = tree.merge({-1: "new", expected.max(): "new"})
+        assert type(merged) is cls and merged._isBalanced()
+        assert list(merged.items())[:2] == [(-1, "new"), tree.select(0)]
+        assert merged[expected.max()] == "new" and len(merged) == len(keys)
+        empty = cls()
+        for method in (empty.popitem, lambda: empty.floor(0), empty.cursor().next):
+            with pytest.raises((KeyError, StopIteration)):
+                method()
+
+
+def test_concurrent():
+    """Stress ConcurrentBSTMap with writer threads and lock-free readers."""
+    tree = ConcurrentBSTMap()
+    writers, per_writer = 4, 500
+    errors = []
+    done = threading.Event()
+
+    def write(w: int) -> None:
+        keys = list(range(w, writers * per_writer, writers))
+        for k in keys:
+            tree[k] = w
+            tree.setdefault(-k - 1, w)
+        for k in keys[::2]:
+            del tree[k]
+        for k in keys[1::2]:
+            tree[k] = tree.pop(-k - 1) + writers
+
+    def read() -> None:
+        while not done.is_set():
+            keys = list(tree)
+            if keys != sorted(keys):
+                errors.append(keys)
+            snap = tree.snapshot()
+            if len(snap) != sum(1 for _ in snap):
+                errors.append(len(snap))
+
+    old_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        readers = [threading.Thread(target=read) for _ in range(2)]
+        threads = [threading.Thread(target=write, args=(w,)) for w in range(writers)]
+        for thread in readers + threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        done.set()
+        for thread in readers:
+            thread.join()
+    finally:
+        sys.setswitchinterval(old_interval)
+    assert not errors
+    assert tree._isBalanced()
+    expected = {}
+    for k in range(writers * per_writer):
+        w = k % writers
+        if (k // writers) % 2:
+            expected[k] = w + writers
+        else:
+            expected[-k - 1] = w
+    assert dict(tree.items()) == expected
+
+
 if __name__ == "__main__":
     test_build()
     test_del()
     test_parent()
+    test_nodes_iter()
+    test_balance()
+    test_order()
+    test_node_comparison()
+    test_range_queries()
+    test_order_statistics()
+    test_bulk()
+    test_traversal()
+    test_cursor()
+    test_persistent()
+    test_persistent_queries()
+    test_concurrent()
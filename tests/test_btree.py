@@ -2,9 +2,10 @@
 # standard library
 
 # third party libraries
+import pytest
 
 # local libraries
-from cs101.btree import BTree
+from cs101.btree import ArrayBTree, BTree
 
 
 def test_btree():
@@ -19,3 +20,53 @@ def test_btree():
 
     assert len(tree) == 7
     assert list(tree.levelorder()) == [1, 2, 3, 4, 5, 6, 7]
+    assert list(tree) == [4, 2, 5, 1, 6, 3, 7]
+    assert list(tree.preorder()) == [1, 2, 4, 5, 3, 6, 7]
+    assert list(tree.postorder()) == [4, 5, 2, 6, 7, 3, 1]
+    assert list(tree.leaves()) == [4, 5, 6, 7]
+
+
+def test_deep_tree():
+    """Test that traversals of a very deep tree do not hit the recursion limit."""
+    n = 10 ** 5
+    root = node = BTree(0)
+    for i in range(1, n):
+        node.right = BTree(i)
+        node = node.right
+    assert len(root) == n
+    assert list(root) == list(range(n)) == list(root.preorder())
+    assert list(root.postorder()) == list(range(n - 1, -1, -1))
+    assert list(root.leaves()) == [n - 1]
+
+
+def test_sizes():
+    """Test that cached subtree sizes follow changes to the tree."""
+    tree = BTree(1, left_child=BTree(2), right_child=BTree(3))
+    assert len(tree) == 3 and len(tree.left) == 1
+    assert tree.left.parent is tree and tree.parent is None
+    tree.left.left = BTree(4, right_child=BTree(5))
+    assert len(tree) == 5 and len(tree.left) == 3
+    old = tree.right
+    tree.right = None
+    assert len(tree) == 4 and old.parent is None
+    tree.left.left.right.right = BTree(6)
+    assert len(tree) == 5 and len(tree.left.left) == 3
+    tree.left = tree.left
+    assert len(tree) == 5
+
+
+def test_array_btree():
+    """Test ArrayBTree against BTree on complete trees of every size up to 40."""
+    assert len(ArrayBTree()) == 0 and list(ArrayBTree()) == []
+    assert ArrayBTree().to_tree() is None
+    for n in range(1, 41):
+        array = ArrayBTree(range(n))
+        tree = array.to_tree()
+        assert len(array) == len(tree) == n
+        for order in ("inorder", "preorder", "postorder", "levelorder", "leaves"):
+            assert list(getattr(array, order)()) == list(getattr(tree, order)())
+        assert list(ArrayBTree.from_tree(tree).levelorder()) == list(range(n))
+    tree = BTree(1, left_child=BTree(2), right_child=BTree(3))
+    tree.right.right = BTree(4)
+    with pytest.raises(ValueError):
+        ArrayBTree.from_tree(tree)
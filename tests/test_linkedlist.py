@@ -1,6 +1,13 @@
 """test_linkedlist.py: Tests for linkedlist.py."""
+# standard library
+from collections import deque
+import random
 
-from cs101.linkedlist import LinkedList
+# third party libraries
+import pytest
+
+# local libraries
+from cs101.linkedlist import ArrayLinkedList, LinkedList
 
 
 def test_build():
@@ -43,6 +50,7 @@ def test_insert():
     ll.insert(0, 0)
     for a, b in zip(lst, ll):
         assert a == b
+    assert len(ll) == len(lst)
 
 
 def test_len():
@@ -69,6 +77,25 @@ def test_getitem():
     ll = LinkedList(lst)
     for i, x in enumerate(lst):
         assert ll[i] == x
+        assert ll[i - len(lst)] == x
+    for i in (len(lst), -len(lst) - 1):
+        with pytest.raises(IndexError):
+            ll[i]
+    with pytest.raises(IndexError):
+        LinkedList()[0]
+
+
+def test_slice():
+    """Test __getitem__ with slices."""
+    lst = list(range(10))
+    ll = LinkedList(lst)
+    for start in (None, 0, 3, -2, 12):
+        for stop in (None, 0, 7, -3, 15):
+            for step in (None, 1, 2, -1, -3):
+                sub = ll[start:stop:step]
+                assert isinstance(sub, LinkedList)
+                assert list(sub) == lst[start:stop:step]
+                assert len(sub) == len(lst[start:stop:step])
 
 
 def test_contains():
@@ -85,6 +112,13 @@ def test_index():
     ll = LinkedList(lst)
     for x in lst:
         assert ll.index(x) == x
+    with pytest.raises(ValueError):
+        ll.index(5)
+    ll = LinkedList([1, 2, 1, 2, 1])
+    assert ll.index(1, 1) == 2
+    assert ll.index(2, -2) == 3
+    with pytest.raises(ValueError):
+        ll.index(2, 0, 1)
 
 
 def test_count():
@@ -95,6 +129,242 @@ def test_count():
         assert ll.count(x) == x
 
 
+def test_deque_api(cls=LinkedList):
+    """Test the deque methods against collections.deque."""
+    ll = cls(range(10))
+    dq = deque(range(10))
+    ops = [
+        lambda c: c.append(random.random()),
+        lambda c: c.appendleft(random.random()),
+        lambda c: c.pop() if c else None,
+        lambda c: c.popleft() if c else None,
+        lambda c: c.rotate(random.randint(-15, 15)),
+        lambda c: c.extend([1, 2, 3]),
+        lambda c: c.extendleft([4, 5, 6]),
+        lambda c: c.remove(1) if 1 in c else None,
+        lambda c: c.reverse(),
+    ]
+    for _ in range(2000):
+        op = random.choice(ops)
+        state = random.getstate()
+        expected = op(dq)
+        random.setstate(state)
+        result = op(ll)
+        if expected is not None:  # appends return a node, unlike with a deque
+            assert result == expected
+        assert list(ll) == list(dq)
+        assert list(reversed(ll)) == list(reversed(dq))
+        assert len(ll) == len(dq)
+    ll.clear()
+    assert len(ll) == 0 and list(ll) == []
+    for pop in (ll.pop, ll.popleft):
+        with pytest.raises(IndexError):
+            pop()
+    with pytest.raises(ValueError):
+        ll.remove(0)
+
+    bounded = cls(range(5), maxlen=3)
+    assert list(bounded) == [2, 3, 4]
+    bounded.appendleft(1)
+    assert list(bounded) == [1, 2, 3]
+    bounded.extend([7, 8])
+    assert list(bounded) == [3, 7, 8]
+    with pytest.raises(IndexError):
+        bounded.insert(0, 0)
+    single = cls([1, 2, 3], maxlen=1)
+    assert list(single) == [3] and len(single) == 1
+    single.appendleft(0)
+    assert list(single) == [0] and list(reversed(single)) == [0]
+    assert cls([1, 2]) + cls([3]) == LinkedList([1, 2, 3])
+    assert bounded.copy() == bounded and bounded.copy() is not bounded
+    assert type(bounded.copy()) is type(bounded[1:]) is cls
+
+
+def test_setitem_delitem(cls=LinkedList):
+    """Test __setitem__, __delitem__, insert and pop against a list."""
+    for _ in range(200):
+        lst = list(range(random.randrange(12)))
+        ll = cls(lst)
+        n = len(lst)
+        start, stop = random.randint(-n - 2, n + 2), random.randint(-n - 2, n + 2)
+        step = random.choice([None, 1, 2, -1, -2])
+        sl = slice(start, stop, step)
+        if step in (None, 1):
+            items = list(range(100, 100 + random.randrange(4)))
+        else:
+            items = list(range(100, 100 + len(lst[sl])))
+        lst[sl] = items
+        ll[sl] = items
+        assert list(ll) == lst and len(ll) == len(lst)
+        sl = slice(random.randint(-n, n), random.randint(-n, n), step)
+        del lst[sl]
+        del ll[sl]
+        assert list(ll) == lst and len(ll) == len(lst)
+        i = random.randint(-n - 2, n + 2)
+        lst.insert(i, "x")
+        ll.insert(i, "x")
+        assert list(ll) == lst
+        i = random.randrange(-len(lst), len(lst))
+        assert ll.pop(i) == lst.pop(i)
+        if lst:
+            i = random.randrange(-len(lst), len(lst))
+            ll[i] = lst[i] = "y"
+            del ll[i]
+            del lst[i]
+        assert list(ll) == lst and len(ll) == len(lst)
+    with pytest.raises(ValueError):
+        cls(range(5))[::2] = [1]
+    with pytest.raises(IndexError):
+        del cls(range(5))[5]
+
+
+def test_node_handles(cls=LinkedList):
+    """Test removing and moving nodes by the handles that appends return."""
+    ll = cls()
+    handles = {x: ll.append(x) for x in range(5)}
+    handles[-1] = ll.appendleft(-1)
+    handles[10] = ll.insert(3, 10)
+    assert list(ll) == [-1, 0, 1, 10, 2, 3, 4]
+    ll.move_to_front(handles[3])
+    ll.move_to_end(handles[-1])
+    assert list(ll) == [3, 0, 1, 10, 2, 4, -1]
+    ll.move_to_end(handles[3])
+    ll.move_to_front(handles[3])
+    assert list(ll) == [3, 0, 1, 10, 2, 4, -1]
+    assert ll.remove_node(handles[10]) == 10
+    assert ll.remove_node(handles[3]) == 3
+    assert ll.remove_node(handles[-1]) == -1
+    assert list(ll) == [0, 1, 2, 4] and len(ll) == 4
+    assert list(reversed(ll)) == [4, 2, 1, 0]
+    for x in (0, 1, 2, 4):
+        ll.remove_node(handles[x])
+    assert len(ll) == 0 and list(ll) == []
+    single = cls()
+    node = single.append(1)
+    single.move_to_end(node)
+    single.move_to_front(node)
+    assert list(single) == [1]
+    single.clear()
+    for method in (single.remove_node, single.move_to_front, single.move_to_end):
+        with pytest.raises(ValueError):
+            method(node)
+    assert len(single) == 0 and list(single) == []
+    if cls is LinkedList:
+        with pytest.raises(ValueError):
+            ll.remove_node(handles[0])
+    else:
+        with pytest.raises(ValueError):
+            ll.move_to_end(handles[0])
+
+
+def test_node_owners():
+    """Test that handles are only accepted by the list that holds their node."""
+    a = LinkedList()
+    h = [a.append(x) for x in range(3)]
+    other = LinkedList([9])
+    for method in (other.remove_node, other.move_to_front, other.move_to_end):
+        with pytest.raises(ValueError):
+            method(h[1])
+    assert len(a) == 3 and list(a) == [0, 1, 2] and list(other) == [9]
+    b = LinkedList(["x"])
+    b.splice(a)
+    b.move_to_front(h[2])
+    assert list(b) == [2, "x", 0, 1] and len(b) == 4
+    with pytest.raises(ValueError):
+        a.remove_node(h[0])
+    # Split off a short tail, and then a long one
+    for cut in (3, 1):
+        tail = b.split_at(b._node_at(cut))
+        for node in h:
+            owner, stranger = (tail, b) if node.data in list(tail) else (b, tail)
+            owner.move_to_end(node)
+            with pytest.raises(ValueError):
+                stranger.move_to_end(node)
+        b.splice(tail)
+    assert sorted(b, key=str) == [0, 1, 2, "x"] and len(b) == 4
+    c = LinkedList()
+    c.splice(b)
+    b.append(5)
+    assert c.remove_node(h[0]) == 0 and len(c) == 3 and list(b) == [5]
+    c.clear()
+    with pytest.raises(ValueError):
+        c.remove_node(h[1])
+
+
+def test_splice_split(cls=LinkedList):
+    """Test splice and split_at, and that extend links a whole batch at once."""
+    ll = cls(range(5))
+    assert list(ll) == [0, 1, 2, 3, 4] and len(ll) == 5
+    ll.extend(iter([5, 6]))
+    ll.extend([])
+    assert list(ll) == list(range(7)) and list(reversed(ll)) == list(range(7))[::-1]
+    other = cls(["a", "b"])
+    ll.splice(other, ll._node_at(2))
+    assert list(ll) == [0, 1, "a", "b", 2, 3, 4, 5, 6] and len(ll) == 9
+    assert list(other) == [] and len(other) == 0
+    ll.splice(cls(["c"]))
+    ll.splice(cls(["d", "e"]), ll._node_at(0))
+    ll.splice(cls())
+    assert list(ll) == ["d", "e", 0, 1, "a", "b", 2, 3, 4, 5, 6, "c"]
+    assert list(reversed(ll)) == list(ll)[::-1] and len(ll) == 12
+    with pytest.raises(ValueError):
+        ll.splice(ll)
+    with pytest.raises(TypeError):
+        ll.splice([1])
+    with pytest.raises(IndexError):
+        cls([1], maxlen=2).splice(cls([2, 3]))
+    empty = cls()
+    empty.splice(cls([1, 2]))
+    assert list(empty) == [1, 2]
+    for cut in range(12):
+        lst = list(ll)
+        right = ll.split_at(ll._node_at(cut))
+        assert list(ll) == lst[:cut] and len(ll) == cut
+        assert list(right) == lst[cut:] and len(right) == 12 - cut
+        assert list(reversed(right)) == lst[cut:][::-1]
+        ll.splice(right)
+        assert list(ll) == lst and len(right) == 0
+    # Slots of an ArrayLinkedList only show that they are free, not their list
+    stranger = cls([1, 2])
+    removed = ll.append("gone")
+    ll.remove_node(removed)
+    strangers = [removed] if cls is ArrayLinkedList else [stranger.head, removed]
+    for node in strangers:
+        with pytest.raises(ValueError):
+            ll.split_at(node)
+        with pytest.raises(ValueError):
+            ll.splice(cls(["z"]), node)
+    assert list(stranger) == [1, 2] and list(ll) == lst
+    bounded = cls(range(5), maxlen=3)
+    bounded.extend([5, 6])
+    assert list(bounded) == [4, 5, 6]
+
+
+def test_array_storage():
+    """Test ArrayLinkedList, and that it reuses the slots of removed items."""
+    test_deque_api(ArrayLinkedList)
+    test_setitem_delitem(ArrayLinkedList)
+    test_node_handles(ArrayLinkedList)
+    test_splice_split(ArrayLinkedList)
+    lst = [1, 2, 3, 4, 5]
+    ll = ArrayLinkedList(lst, capacity=2)
+    assert list(ll) == lst and list(reversed(ll)) == lst[::-1]
+    assert ll[-2] == 4 and ll.index(3) == 2 and 3 in ll and ll.count(3) == 1
+    ll.reverse()
+    ll.append(0)
+    assert list(ll) == [5, 4, 3, 2, 1, 0]
+    capacity = len(ll._data)
+    for i in range(10000):
+        ll.append(i)
+        ll.popleft()
+    assert len(ll._data) == capacity
+    assert list(ll._nodes()) == [ll._node_at(i) for i in range(len(ll))]
+    ll.clear()
+    assert list(ll) == [] and len(ll) == 0
+    ll.extend(range(capacity))
+    assert len(ll._data) == capacity and list(ll) == list(range(capacity))
+
+
 if __name__ == "__main__":
     test_build()
     test_append()
@@ -103,6 +373,13 @@ if __name__ == "__main__":
     test_len()
     test_reversed()
     test_getitem()
+    test_slice()
     test_contains()
     test_index()
     test_count()
+    test_deque_api()
+    test_setitem_delitem()
+    test_node_handles()
+    test_node_owners()
+    test_splice_split()
+    test_array_storage()
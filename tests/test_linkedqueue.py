@@ -0,0 +1,122 @@
+"""test_linkedqueue.py: tests for the linked queue module."""
+# standard library
+import asyncio
+import queue
+import threading
+
+# third party libraries
+import pytest
+
+# local libraries
+from cs101.linkedqueue import AsyncLinkedQueue, LinkedQueue
+
+
+def test_queue():
+    """Test LinkedQueue from one thread, including its bound and timeouts."""
+    q = LinkedQueue(maxsize=3)
+    assert q.empty() and not q.full() and q.qsize() == 0
+    for i in range(3):
+        q.put(i)
+    assert q.full() and q.qsize() == 3
+    with pytest.raises(queue.Full):
+        q.put_nowait(3)
+    with pytest.raises(queue.Full):
+        q.put(3, timeout=0.01)
+    assert q.get() == 0
+    q.put_nowait(3)
+    assert q.get_many(2) == [1, 2]
+    assert q.get_many(10) == [3]
+    with pytest.raises(queue.Empty):
+        q.get_nowait()
+    with pytest.raises(queue.Empty):
+        q.get_many(2, timeout=0.01)
+    with pytest.raises(ValueError):
+        q.get_many(0)
+    unbounded = LinkedQueue()
+    for i in range(100):
+        unbounded.put_nowait(i)
+    assert not unbounded.full() and unbounded.get_many(100) == list(range(100))
+
+
+def test_threads():
+    """Test that producer threads block on a full queue and items all arrive."""
+    q = LinkedQueue(maxsize=10)
+    producers, n = 4, 1000
+
+    def produce(start):
+        for i in range(start, start + n):
+            q.put(i)
+
+    threads = [
+        threading.Thread(target=produce, args=(p * n,)) for p in range(producers)
+    ]
+    for thread in threads:
+        thread.start()
+    received = []
+    while len(received) < producers * n:
+        assert q.qsize() <= 10
+        received.extend(q.get_many(7, timeout=5))
+    for thread in threads:
+        thread.join()
+    assert sorted(received) == list(range(producers * n))
+    # Each producer's items arrive in the order it put them
+    for p in range(producers):
+        mine = [i for i in received if p * n <= i < (p + 1) * n]
+        assert mine == sorted(mine)
+
+
+def test_async():
+    """Test AsyncLinkedQueue with producer and consumer tasks."""
+
+    async def main():
+        q = AsyncLinkedQueue(maxsize=5)
+        with pytest.raises(asyncio.QueueEmpty):
+            q.get_nowait()
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(q.get(), 0.01)
+
+        async def produce(start):
+            for i in range(start, start + 100):
+                await q.put(i)
+                assert q.qsize() <= 5
+
+        producers = [asyncio.ensure_future(produce(p * 100)) for p in range(3)]
+        received = [await q.get()]
+        while len(received) < 300:
+            received.extend(await q.get_many(4))
+        await asyncio.gather(*producers)
+        assert sorted(received) == list(range(300)) and q.empty()
+        for i in range(5):
+            q.put_nowait(i)
+        assert q.full()
+        with pytest.raises(asyncio.QueueFull):
+            q.put_nowait(5)
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(q.put(5), 0.01)
+        assert q.get_nowait() == 0 and await q.get_many(10) == [1, 2, 3, 4]
+
+    asyncio.run(main())
+
+
+def test_async_before_loop():
+    """Test an AsyncLinkedQueue made before the event loop runs."""
+    q = AsyncLinkedQueue(maxsize=1)
+
+    async def main():
+        async def produce():
+            for i in range(10):
+                await q.put(i)
+
+        producer = asyncio.ensure_future(produce())
+        received = [await q.get() for _ in range(10)]
+        await producer
+        assert received == list(range(10))
+
+    asyncio.run(main())
+
+
+if __name__ == "__main__":
+    test_queue()
+    test_threads()
+    test_async()
+    test_async_before_loop()
@@ -0,0 +1,64 @@
+"""test_lrucache.py: tests for the LRU cache module."""
+# standard library
+from collections import OrderedDict
+import random
+
+# third party libraries
+import pytest
+
+# local libraries
+from cs101.lrucache import LRUCache
+
+
+def test_eviction():
+    """Test that the least recently used key is evicted first."""
+    cache = LRUCache(maxsize=3)
+    for k in "abc":
+        cache[k] = k.upper()
+    assert cache["a"] == "A"
+    cache["d"] = "D"
+    assert list(cache) == ["c", "a", "d"]
+    assert "b" not in cache
+    cache["c"] = "C2"
+    cache["e"] = "E"
+    assert list(cache.items()) == [("d", "D"), ("c", "C2"), ("e", "E")]
+    assert cache.evictions == 2
+    del cache["c"]
+    assert len(cache) == 2
+    with pytest.raises(KeyError):
+        del cache["c"]
+    with pytest.raises(ValueError):
+        LRUCache(maxsize=0)
+
+
+def test_counters():
+    """Test the hit, miss and eviction counters against an OrderedDict model."""
+    cache = LRUCache(maxsize=50)
+    model: OrderedDict = OrderedDict()
+    hits = misses = evictions = 0
+    for _ in range(5000):
+        k = random.randrange(100)
+        if random.random() < 0.5:
+            if k in model:
+                hits += 1
+                model.move_to_end(k)
+                assert cache[k] == model[k]
+            else:
+                misses += 1
+                assert cache.get(k) is None
+        else:
+            if k not in model and len(model) == 50:
+                model.popitem(last=False)
+                evictions += 1
+            model[k] = random.random()
+            model.move_to_end(k)
+            cache[k] = model[k]
+        assert list(cache.items()) == list(model.items())
+    assert (cache.hits, cache.misses, cache.evictions) == (hits, misses, evictions)
+    cache.clear()
+    assert len(cache) == 0 and cache.hits == hits
+
+
+if __name__ == "__main__":
+    test_eviction()
+    test_counters()
@@ -1 +1,34 @@
 """test_pyutils.py: Tests for pyutils.py."""
+
+# local libraries
+from cs101.pyutils import allocated_bytes, without_slots
+
+
+class Point:
+    """A slotted class for testing without_slots."""
+
+    __slots__ = ("x", "y")
+
+    def __init__(self, x: int, y: int) -> None:
+        """Initialize a point."""
+        self.x = x
+        self.y = y
+
+    def norm1(self) -> int:
+        """Return the 1-norm of the point."""
+        return abs(self.x) + abs(self.y)
+
+
+def test_without_slots():
+    """Test that the copy of a slotted class uses a __dict__ and keeps its methods."""
+    DictPoint = without_slots(Point)
+    point = DictPoint(3, -4)
+    assert point.__dict__ == {"x": 3, "y": -4}
+    assert point.norm1() == 7
+    assert not hasattr(Point(3, -4), "__dict__")
+
+
+def test_allocated_bytes():
+    """Test that allocated_bytes counts the memory held by the result."""
+    assert allocated_bytes(lambda: bytearray(10 ** 6)) >= 10 ** 6
+    assert allocated_bytes(lambda: None) < 10 ** 4
@@ -1,14 +1,27 @@
 """Unit tests for rope.py."""
 
 # standard library
+import io
 import itertools as it
+import operator as op
+from functools import reduce
 
 # third party
+import pytest
 
 # local module
-from cs101.rope import Rope
+from cs101.rope import EAGER, LAZY, NEVER, Rope, RopeConfig, _MappedText
 
 test_str = "Hello world, my name is Jimbo!"
+search_str = "abracadabra, abracadabra! cadabra abra"
+# Small leaves that are never merged, to exercise leaf boundaries
+small_leaves = RopeConfig(min_leaf_len=0, max_leaf_len=4)
+
+
+def char_rope(string: str) -> Rope:
+    """Build a rope with one leaf per character of string."""
+    config = small_leaves._replace(max_leaf_len=1)
+    return reduce(op.add, (Rope(c, config=config) for c in string), Rope())
 
 
 def test_get(rope=Rope(test_str)):
@@ -21,6 +34,20 @@ def test_get(rope=Rope(test_str)):
         assert rope[start:stop] == string[start:stop]
 
 
+def test_slice(string=test_str):
+    """Test that slices are ropes and that cached lookups stay correct."""
+    rope = char_rope(string)
+    for start, stop, step in it.product([None, 0, 3, -5], [None, 7, -2], [None, 2, -1]):
+        piece = rope[start:stop:step]
+        assert isinstance(piece, Rope)
+        assert piece == string[start:stop:step]
+    for i in it.chain(range(len(string)), reversed(range(-len(string), 0))):
+        assert rope[i] == string[i]
+    with pytest.raises(IndexError):
+        rope[len(string)]
+    assert rope[:] is rope
+
+
 def test_concat(string=test_str):
     assert Rope(string) * 3 == string * 3
     assert Rope("") * 3 == "" * 3
@@ -65,12 +92,242 @@ def test_logic(string=test_str):
     assert bool(Rope("")) is bool("")
 
 
+def test_find(string=search_str):
+    """Test find, rfind and index across leaf boundaries."""
+    rope = char_rope(string)
+    subs = ["a", "abra", "cadabra", "ra, a", "abracadabra!", "", "zzz", string]
+    bounds = [(0, None), (3, None), (5, 20), (-10, None), (0, -3), (40, None)]
+    for sub in subs:
+        for start, end in bounds:
+            assert rope.find(sub, start, end) == string.find(sub, start, end)
+            assert rope.rfind(sub, start, end) == string.rfind(sub, start, end)
+            assert rope.find(Rope(sub), start, end) == string.find(sub, start, end)
+        if sub in string:
+            assert rope.index(sub) == string.index(sub)
+            assert rope.rindex(sub) == string.rindex(sub)
+        else:
+            with pytest.raises(ValueError):
+                rope.index(sub)
+
+
+def test_count(string=search_str):
+    """Test count, finditer and __contains__ across leaf boundaries."""
+    rope = char_rope(string)
+    for sub in ["a", "aa", "abra", "bra", "cadabra ", "", "zzz"]:
+        assert rope.count(sub) == string.count(sub)
+        assert rope.count(sub, 4, -4) == string.count(sub, 4, -4)
+        assert (sub in rope) is (sub in string)
+    assert list(rope.finditer("abra")) == [0, 7, 13, 20, 29, 34]
+    assert char_rope("aaaa").count("aa") == 2
+
+
+def test_build():
+    """Test bulk construction from strings, chunks and files is balanced."""
+    string = test_str * 5
+    rope = Rope(string, config=small_leaves)
+    assert rope == string
+    assert len(list(rope._leaves())) == -(-len(string) // 4)
+    assert rope._max_depth() <= 7
+    chunks = [string[i : i + 7] for i in range(0, len(string), 7)]
+    assert Rope.from_chunks(chunks, small_leaves) == string
+    assert Rope.from_chunks(chunks, small_leaves)._max_depth() <= 7
+    assert Rope.from_chunks([]) == ""
+
+
+def test_from_file(tmp_path):
+    """Test streaming a Rope from a text file."""
+    path = tmp_path / "rope.txt"
+    string = "line one\r\nline two\nünïcödé " * 10
+    path.write_text(string, encoding="utf-8", newline="")
+    rope = Rope.from_file(str(path), config=small_leaves)
+    assert rope == string
+    assert max(len(leaf) for leaf in rope._leaves()) == 4
+
+
+def test_from_mmap(tmp_path, monkeypatch):
+    """Test that mapped leaves are only decoded when their text is needed."""
+    path = tmp_path / "rope.log"
+    string = "".join(f"{i:04d} log line\n" for i in range(50))
+    path.write_bytes(string.encode("latin-1"))
+
+    def no_reads(self):
+        raise AssertionError("mapped text was read")
+
+    with monkeypatch.context() as m:
+        m.setattr(_MappedText, "__str__", no_reads)
+        rope = Rope.from_mmap(str(path), config=RopeConfig(max_leaf_len=8))
+        assert len(rope) == len(string)
+        edited = rope.put(101, "INSERTED").delete(13, 250)._rebalance()
+        left, right = edited._cut(77)
+        assert len(left) + len(right) == len(edited)
+    assert rope == string
+    expected = string[:101] + "INSERTED" + string[101:]
+    assert edited == expected[:13] + expected[250:]
+    assert rope[9:14] == string[9:14]
+    assert rope.find("0042") == string.find("0042")
+    with pytest.raises(ValueError):
+        Rope.from_mmap(str(path), encoding="utf-8")
+    empty = tmp_path / "empty.log"
+    empty.write_bytes(b"")
+    assert Rope.from_mmap(str(empty)) == ""
+    assert Rope.from_mmap(str(empty), encoding=None) == b""
+    assert Rope.from_file(str(empty), encoding=None) == b""
+    assert Rope.from_file(str(empty)) == ""
+
+
+def test_iter(string=search_str):
+    """Test iteration, chunks, comparison and hashing across leaf boundaries."""
+    ropes = [Rope(string), Rope(string, config=small_leaves), char_rope(string)]
+    for rope in ropes:
+        assert list(rope) == list(string)
+        assert list(reversed(rope)) == list(reversed(string))
+        assert "".join(rope.chunks()) == string
+        assert "".join(rope.chunks(5, 23)) == string[5:23]
+        assert all(a == b and hash(a) == hash(b) for a, b in it.product(ropes, ropes))
+        assert rope == string and hash(rope) == hash(string)
+        assert rope != string[:-1] + "?"
+        assert rope != string.encode()
+    assert char_rope(string)[:-1] != Rope(string[:-2] + "?")
+    assert list(Rope(b"abc", config=small_leaves)) == list(b"abc")
+    assert list(reversed(Rope(b"abcdef", config=small_leaves))) == list(b"fedcba")
+
+
+def test_rebalance():
+    """Test that rebalancing keeps the text and satisfies the balance condition."""
+    pieces = [test_str[: i % 7 + 1] for i in range(200)]
+    rope = reduce(Rope._concat, (Rope(p, config=small_leaves) for p in pieces))
+    balanced = rope._rebalance()
+    assert balanced == "".join(pieces)
+    assert balanced._is_balanced()
+    assert balanced._max_depth() < rope._max_depth()
+
+
+def test_rebalance_policy():
+    """Test the eager, lazy and never rebalancing policies under repeated edits."""
+    depths = {}
+    for policy in [EAGER, LAZY, NEVER]:
+        rope = Rope(test_str, config=small_leaves._replace(rebalance=policy))
+        string = test_str
+        for i in range(200):
+            rope = (rope + str(i % 10)).put(10, "-").delete(20, 21)
+            string = string + str(i % 10)
+            string = string[:10] + "-" + string[10:]
+            string = string[:20] + string[21:]
+            if policy == EAGER:
+                assert rope._is_balanced()
+        assert rope == string
+        assert rope._config.rebalance == policy
+        depths[policy] = rope._max_depth()
+    assert depths[EAGER] < depths[LAZY] <= Rope._lazy_max_depth + 1 < depths[NEVER]
+    # Deleting from the front rebalances too, as every other edit does
+    eager = small_leaves._replace(rebalance=EAGER)
+    rope = Rope("abcd", config=eager)
+    for _ in range(50):
+        rope = rope._join(Rope("efgh", config=eager))
+    assert not rope._is_balanced()
+    assert rope.delete(0, 1)._is_balanced() and rope.delete(0, 1) == str(rope)[1:]
+    assert "ab" + Rope("cd") == "abcd"
+
+
+def test_coalesce():
+    """Test that small leaves are merged by concatenation and cut."""
+    config = RopeConfig(min_leaf_len=8, max_leaf_len=16)
+    rope = Rope(config=config)
+    string = ""
+    for i in range(100):
+        rope = rope.put(len(rope) // 2, str(i % 10))
+        string = string[: len(string) // 2] + str(i % 10) + string[len(string) // 2 :]
+    assert rope == string
+    lengths = [len(leaf) for leaf in rope._leaves()]
+    assert max(lengths) <= 16
+    assert sum(lengths) / len(lengths) > 4
+    assert len(list(Rope("ab", config=config).put(1, "-")._leaves())) == 1
+    unmerged = Rope("ab", config=small_leaves).put(1, "-")
+    assert len(list(unmerged._leaves())) == 3
+
+
+def test_lines():
+    """Test line counts and line / column addressing."""
+    string = "first\nsecond line\n\nfourth\n" + test_str + "\nlast"
+    lines = string.split("\n")
+    for rope in [Rope(string), Rope(string, config=small_leaves), char_rope(string)]:
+        edited = rope.put(8, "\n").delete(8, 9)
+        for r in [rope, edited, rope._rebalance()]:
+            assert r.line_count() == len(lines)
+            for n, line in enumerate(lines):
+                assert r.line(n) == line
+                start = r.linecol_to_offset(n, 0)
+                assert string[start : start + len(line)] == line
+            assert r.line(-1) == lines[-1]
+            for i in range(len(string) + 1):
+                line, col = r.offset_to_linecol(i)
+                assert r.linecol_to_offset(line, col) == i
+                assert line == string[:i].count("\n")
+    with pytest.raises(IndexError):
+        Rope(string).line(len(lines))
+    with pytest.raises(IndexError):
+        Rope(string).linecol_to_offset(0, 6)
+    assert Rope("").line_count() == 1
+    assert Rope(b"a\nb", config=small_leaves).line(1) == b"b"
+
+
+def test_bytes():
+    """Test binary ropes built from bytes-like objects."""
+    data = bytearray(search_str.encode())
+    rope = Rope(data, config=small_leaves)
+    assert all(leaf._text.obj is data for leaf in rope._leaves())
+    assert rope == bytes(data)
+    assert bytes(rope) == bytes(data)
+    assert hash(rope) == hash(bytes(data))
+    assert rope[3] == data[3]
+    assert rope[2:17] == data[2:17]
+    assert rope[::-3] == data[::-3]
+    left, right = rope._cut(9)
+    assert all(isinstance(leaf._text, memoryview) for leaf in left._leaves())
+    assert (left, right) == (data[:9], data[9:])
+    assert rope.put(5, b"--").delete(0, 3) == (data[:5] + b"--" + data[5:])[3:]
+    assert rope.find(b"cadabra") == data.find(b"cadabra")
+    assert rope.rfind(b"abra", 0, 30) == data.rfind(b"abra", 0, 30)
+    assert rope.count(Rope(b"a")) == data.count(b"a")
+    assert 97 in rope and rope.find(98) == data.find(98)
+    with pytest.raises(ValueError):
+        256 in rope
+    assert Rope(b"") != Rope("") and Rope(b"a") != Rope("a") and Rope("") != b""
+    assert Rope.from_chunks([b"abc", bytearray(b"defgh"), b"i"]) == b"abcdefghi"
+    empty = Rope.from_chunks([b""])
+    assert empty == b"" and repr(empty) == "Rope(b'')"
+    with pytest.raises(TypeError):
+        rope + "text"
+
+
+def test_write_to(tmp_path):
+    """Test writing ropes out leaf by leaf."""
+    binary = Rope(search_str.encode(), config=small_leaves)
+    buf = io.BytesIO()
+    binary.write_to(buf)
+    assert buf.getvalue() == search_str.encode()
+    text = io.StringIO()
+    Rope(search_str, config=small_leaves).write_to(text)
+    assert text.getvalue() == search_str
+    path = tmp_path / "data.bin"
+    path.write_bytes(bytes(range(256)))
+    assert Rope.from_file(str(path), encoding=None) == bytes(range(256))
+    assert Rope.from_mmap(str(path), encoding=None)[100:110] == bytes(range(100, 110))
+
+
 if __name__ == "__main__":
     test_get()
+    test_slice()
     test_concat()
     test_cut()
     test_put()
     test_delete()
     test_logic()
+    test_find()
+    test_count()
+    test_iter()
+    test_rebalance()
+    test_rebalance_policy()
+    test_lines()
 
     print("All tests passed!")
@@ -0,0 +1,153 @@
+"""test_sortedmap.py: tests for the sorted list map module."""
+# standard library
+import random
+
+# third party libraries
+import pytest
+
+# local libraries
+from cs101.bstmap import BSTMap
+from cs101.sortedmap import SortedMap
+
+
+class SmallMap(SortedMap):
+    """A SortedMap with short lists, so that a few keys exercise splits and merges."""
+
+    __slots__ = ()
+    _load = 4
+
+
+def test_build():
+    """Test constructing a SortedMap."""
+    init = []
+    for _ in range(1000):
+        n = random.randrange(1, 10000)
+        init.append((n, n))
+    for cls in (SortedMap, SmallMap):
+        smap = cls(init)
+        assert smap._isSorted()
+        assert list(smap) == sorted(set(k for k, _ in init))
+        for key in smap:
+            assert smap[key] == key
+
+
+def test_edits():
+    """Test inserts and deletes against a dict, with lists split and merged."""
+    smap = SmallMap()
+    expected = {}
+    for _ in range(3000):
+        k = random.randrange(500)
+        if k in expected and random.random() < 0.5:
+            del smap[k]
+            del expected[k]
+            assert k not in smap
+        else:
+            smap[k] = expected[k] = random.random()
+        assert smap._isSorted()
+    assert list(smap.items()) == sorted(expected.items())
+    assert len(smap) == len(expected)
+    for k in list(expected):
+        del smap[k]
+    assert smap._isSorted()
+    assert len(smap) == 0 and list(smap) == []
+    with pytest.raises(KeyError):
+        del smap[0]
+
+
+def test_order():
+    """Test that keys are ordered by value, or by the key function."""
+    words = ["pear", "Apple", "fig", "banana", "Cherry"]
+    smap = SmallMap(((w, len(w)) for w in words), key=str.lower)
+    assert list(smap) == sorted(words, key=str.lower)
+    assert "APPLE" in smap and smap["FIG"] == 3
+    del smap["PEAR"]
+    smap["grape"] = 5
+    assert list(smap) == ["Apple", "banana", "Cherry", "fig", "grape"]
+    assert smap._isSorted()
+
+
+def test_same_as_bstmap():
+    """Test that the queries shared with BSTMap give the same answers."""
+    keys = random.sample(range(0, 10000, 2), 1000)
+    tree = BSTMap((k, -k) for k in keys)
+    smap = SmallMap((k, -k) for k in keys)
+    assert list(smap.items()) == list(tree.items())
+    assert str(smap) == str(tree)
+    for _ in range(100):
+        lo, hi = sorted(random.sample(range(-10, 10010), 2))
+        for inclusive in [(True, True), (False, False), (True, False)]:
+            for reverse in (False, True):
+                args = lo, hi, inclusive, reverse
+                assert list(smap.irange(*args)) == list(tree.irange(*args))
+        assert list(smap.irange(minimum=lo)) == list(tree.irange(minimum=lo))
+        assert list(smap.irange(maximum=hi)) == list(tree.irange(maximum=hi))
+        assert smap.bisect(lo) == tree.bisect(lo)
+        assert smap.rank(hi) == tree.rank(hi)
+        for method in ("floor", "ceiling"):
+            try:
+                expected = getattr(tree, method)(lo)
+            except KeyError:
+                with pytest.raises(KeyError):
+                    getattr(smap, method)(lo)
+            else:
+                assert getattr(smap, method)(lo) == expected
+    for i in range(-len(keys), len(keys)):
+        assert smap.select(i) == tree.select(i)
+    for k in keys:
+        assert smap.index(k) == tree.index(k)
+    with pytest.raises(ValueError):
+        smap.index(1)
+    with pytest.raises(IndexError):
+        smap.select(len(keys))
+    assert smap.min() == tree.min() and smap.max() == tree.max()
+    assert smap.popitem() == tree.popitem()
+    assert smap.popitem(last=False) == tree.popitem(last=False)
+    assert list(smap.items()) == list(tree.items())
+    empty = SortedMap()
+    assert list(empty.irange(0, 10)) == []
+    for method in (empty.min, empty.max, empty.popitem):
+        with pytest.raises(KeyError):
+            method()
+
+
+def test_bulk():
+    """Test from_sorted, update and merge."""
+    smap = SmallMap.from_sorted([(k, k) for k in range(1000)] + [(999, "last")])
+    assert smap._isSorted()
+    assert list(smap.items()) == [(k, k) for k in range(999)] + [(999, "last")]
+    with pytest.raises(ValueError):
+        SortedMap.from_sorted([(2, 2), (1, 1)])
+    smap = SortedMap.from_sorted([("a", 1), ("B", 2)], key=str.lower)
+    smap.update({"A": 3}, c=4)
+    assert list(smap.items()) == [("a", 3), ("B", 2), ("c", 4)]
+    assert len(SortedMap.from_sorted([])) == 0
+
+    evens = SmallMap((k, "even") for k in range(0, 1000, 2))
+    odds = SortedMap((k, "odd") for k in range(1, 1000, 2))
+    merged = evens.merge(odds)
+    assert list(merged) == list(range(1000)) and type(merged) is SmallMap
+    assert merged._isSorted()
+    assert len(evens) == len(odds) == 500
+    # Sorted maps of either kind are merged without sorting their items again
+    tree = BSTMap((k, "tree") for k in range(500, 1500))
+    items = list(evens.merge(tree).items())
+    assert len(items) == 1250 and items[249:251] == [(498, "even"), (500, "tree")]
+    assert list(tree.merge(evens).values()).count("even") == 500
+    # Few new items are inserted one by one, many are merged and rebuilt
+    for n in (3, 3000):
+        smap = SmallMap((k, k) for k in range(1000))
+        new = {k: -k for k in random.sample(range(-2000, 2000), n)}
+        smap.update(new)
+        expected = {k: k for k in range(1000)}
+        expected.update(new)
+        assert list(smap.items()) == sorted(expected.items())
+        assert len(smap) == len(expected)
+        assert smap._isSorted()
+
+
+if __name__ == "__main__":
+    test_build()
+    test_edits()
+    test_order()
+    test_same_as_bstmap()
+    test_bulk()